@@ -0,0 +1,68 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Fast client for the hotkeys, it delegates the commands to the running instance
+
+Every hotkey press starts a new process, so only the minimum is imported:
+the low level _socket instead of socket (that imports enum, selectors, etc.),
+the config, the address rules and the framed protocol. If no instance is running, the full app
+is started by main, that is slower anyway.
+"""
+
+import _socket
+import sys
+
+from cliptools import config
+from cliptools.modules import address, ipc
+
+
+def connect():
+    """Connect to the running instance, return None if there is none
+    The address follows the rules of the server, TCP is used only if the server uses it"""
+    target = address.get_address(create=False)
+    if isinstance(target, str):
+        sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    else:
+        sock = _socket.socket(_socket.AF_INET, _socket.SOCK_STREAM)
+    try:
+        sock.connect(target)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def delegate(args):
+    """Send the commands to the running instance
+    Return: None - no instance; true - ok; false - ops, we connected something else..."""
+    sock = connect()
+    if sock is None:
+        return None
+    try:
+        ipc.send_keys(sock, args)
+        sock.shutdown(_socket.SHUT_WR)
+        response = ipc.recv_message(sock)
+    except (OSError, ipc.ProtocolError):
+        return False
+    finally:
+        sock.close()
+    return response == (ipc.RESPONSE, config.SERVER_SUCCESS.encode("utf-8"))
+
+
+def main():
+    """Main function of the client
+    Commands are delegated, or the app is started if it is not running yet
+    The modes of the app (headless, apply, batch) are not delegated, they are run here"""
+    args = sys.argv[1:]
+    own_mode = "--headless" in args or args[:1] in (["apply"], ["batch"])
+    result = None if own_mode else delegate(args)
+    if result is None:
+        from cliptools import main as app  # pylint: disable=import-outside-toplevel
+
+        app.main()
+    elif not result:
+        sys.exit("Ops, something bad happened, maybe we contacted something else...")
+
+
+if __name__ == "__main__":
+    main()
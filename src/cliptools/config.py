@@ -10,6 +10,16 @@ Constants, configurations and shared info
 # *.py or *.yml files are supported.
 EXTERNAL_DATA = "cliptools_external_data.yml"
 
+# Transport of the inter process communication
+# "auto": Unix domain socket on Linux, TCP elsewhere or when it is not available
+# "unix": Unix domain socket in the per-user runtime directory
+# "tcp": TCP socket on localhost with the PORT below
+TRANSPORT = "auto"
+
+# Name of the Unix domain socket in the runtime directory
+# $XDG_RUNTIME_DIR is used, if not set then /tmp/cliptools-<user id>
+SOCKET_NAME = "cliptools.sock"
+
 # Port number used for inter process communication
 # only localhost is allowed, no external connections
 PORT = 5555
@@ -17,16 +27,64 @@ PORT = 5555
 # Internal message for identification
 SERVER_SUCCESS = "CLIP-OK."
 
+# Seconds a delegating client has to send a message, then it is disconnected
+SERVER_TIMEOUT = 5
+
+# Size limit of a delegated message in bytes
+SERVER_MAX_MESSAGE = 64 * 1024 * 1024
+
+# Number of clients served at once, others wait until one is finished
+SERVER_MAX_CLIENTS = 32
+
 # Number of rows in the GUI, should be between 1 and 9, but maybe 9 is the best
 # Note: if you change NUMBER_OF_ROWS value change commands accordingly
 NUMBER_OF_ROWS = 20
 
+# Use a scrollable virtual list instead of the fixed lines
+# it is better for browsing long histories, but less keyboard friendly
+VIRTUAL_LIST = False
+
 # Number of clipboard history to store
 MAX_NUMBER_OF_DATA = 50
 
+# Memory limit of the action preview cache in bytes
+PREVIEW_CACHE_SIZE = 16 * 1024 * 1024
+
+# Number of background threads running the actions
+ACTION_WORKERS = 4
+
+# Default time limit of an action in seconds, after that an error is shown
+ACTION_TIMEOUT = 10
+
+# Period of checking the action time limits in seconds
+ACTION_WATCH_INTERVAL = 0.1
+
+# Number of characters loaded at once into the details panel texts
+DETAILS_TEXT_LIMIT = 100_000
+
+# Number of characters read at once by the pipe mode: cliptools apply ACTION
+PIPE_CHUNK_SIZE = 1024 * 1024
+
 # Displayed string length, longer strings truncated to display
 STRING_LENTH = 30
 
 # What clipboard backed to use, Pyperclip ow wx-python
 
 USE_PY_PER_CLIP = True
+
+# Clipboard backend: "auto", "watch", "pyperclip", "wx" or "fake"
+# auto is using a long-lived helper process to watch the clipboard if possible,
+# else pyperclip or wx-python according to USE_PY_PER_CLIP
+CLIP_BACKEND = "auto"
+
+# Poll interval of the X11 clipboard watching helper in milliseconds
+CLIP_WATCH_INTERVAL = 250
+
+# Clipboard poll intervals of the app in milliseconds
+# shortest is used after changes, it grows to the longest when idle
+CLIP_POLL_MIN = 250
+CLIP_POLL_MAX = 1000
+CLIP_POLL_MINIMIZED = 2000
+# longest interval for backends that do not queue the changes (pyperclip, wx),
+# clips replaced within it are lost, it was the fixed interval before
+CLIP_POLL_UNQUEUED = 500
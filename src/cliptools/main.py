@@ -10,6 +10,7 @@ import socket
 import sys
 
 from cliptools import config
+from cliptools.modules import ipc, transport
 
 
 def _try_delegate_to_existing_instance(args):
@@ -19,44 +20,53 @@ def _try_delegate_to_existing_instance(args):
     Function taken from Thonny, Python IDE for beginners at https://thonny.org/
     """
     try:
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.bind(("localhost", config.PORT))
-        server_socket.listen(10)
+        server_socket = transport.create_server()
         # we were able to create server socket (ie. app was not running)
         # Let's use the socket in the app
         return server_socket
     except OSError:
-        # port was already taken, most likely by previous instance.
+        # address was already taken, most likely by previous instance.
         # Try to connect and send arguments
         return _delegate_to_existing_instance(args)
 
 
-def _delegate_to_existing_instance(args):
+def _delegate_to_existing_instance(args, address=None):
     """Sending arguments to existing instance
     If an error happen we quit, no fancy messages here
     Return: true - ok; false - ops, we connected something else...
 
     Function taken from Thonny, Python IDE for beginners at https://thonny.org/
     """
-    data = repr(args).encode(encoding="utf_8")
-    sock = socket.create_connection(("localhost", config.PORT))
-    sock.sendall(data)
-    sock.shutdown(socket.SHUT_WR)
-    response = bytes([])
-    while len(response) < len(config.SERVER_SUCCESS):
-        new_data = sock.recv(2)
-        if not new_data:
-            break
-        response += new_data
-    return response.decode("UTF-8") == config.SERVER_SUCCESS
+    with transport.connect(address) as sock:
+        ipc.send_keys(sock, args)
+        sock.shutdown(socket.SHUT_WR)
+        try:
+            response = ipc.recv_message(sock)
+        except ipc.ProtocolError:
+            return False
+    return response == (ipc.RESPONSE, config.SERVER_SUCCESS.encode("utf-8"))
 
 
 def main():
     """Main function
     Trying whether there is an existing app, or start a new one
     command line parameters are passed in any way
+    --headless starts the app without GUI, it can be driven by the delegated commands
+    apply ACTION runs the pipe mode, batch ACTION DIR the batch mode, no app is started
     """
-    delegation_result = _try_delegate_to_existing_instance(sys.argv[1:])
+    args = sys.argv[1:]
+    if args[:1] == ["apply"]:
+        from cliptools.modules import pipe  # pylint: disable=import-outside-toplevel
+
+        sys.exit(pipe.main(args[1:]))
+    if args[:1] == ["batch"]:
+        from cliptools.modules import batch  # pylint: disable=import-outside-toplevel
+
+        sys.exit(batch.main(args[1:]))
+    headless = "--headless" in args
+    if headless:
+        args.remove("--headless")
+    delegation_result = _try_delegate_to_existing_instance(args)
     if delegation_result is True:
         # we're done
         print("Delegated to an existing instance. Exiting now.")
@@ -74,9 +84,14 @@ def main():
         sys.exit(1)
 
     # So far ok, time to load the entire app and start working
-    from cliptools.modules import controller  # pylint: disable=import-outside-toplevel
+    if headless:
+        from cliptools.modules import engine  # pylint: disable=import-outside-toplevel
 
-    control = controller.Controller(server_socket, sys.argv[1:])
+        control = engine.Engine(engine.Renderer(), server_socket, args)
+    else:
+        from cliptools.modules import controller  # pylint: disable=import-outside-toplevel
+
+        control = controller.Controller(server_socket, args)
     control.start()
 
 
@@ -0,0 +1,185 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Background execution of the actions, slow actions should not freeze the GUI
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cliptools import config
+
+
+# Placeholder text shown until the result arrives
+COMPUTING = "computing…"
+
+
+class Job:
+    """Book-keeping of a submitted action
+    Deadline is counted from the start of the run, waiting in the queue is not limited.
+    Timed out jobs lose their worker, so the queue moves on anyway."""
+
+    def __init__(self, text, action, callback, detached=False, errback=None):
+        self.text = text
+        self.action = action
+        self.callback = callback
+        self.errback = errback
+        self.error = None  # message of the failure
+        self.detached = detached
+        self.timeout = getattr(action, "timeout", None) or config.ACTION_TIMEOUT
+        self.deadline = None  # set when the run starts
+        self.future = None
+
+    def run(self):
+        """Called in the worker thread, exceptions are turned into error messages"""
+        self.deadline = time.monotonic() + self.timeout
+        try:
+            return self.action(self.text)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.error = str(exc)
+            return None
+
+    def fail(self, message):
+        """Report the failure, by the errback or as an error text"""
+        if self.errback is not None:
+            self.errback(message)
+        else:
+            self.callback("ERROR: {}".format(message))
+
+
+class ActionRunner:
+    """Run actions in a thread pool and deliver the results to the GUI thread
+
+    deliver is a function like wx.CallAfter, it will call the given function
+    with the arguments in the GUI thread. All the other methods should be called
+    from the GUI thread too, so no locking is needed.
+
+    notify is called after each delivered result, usually to update the GUI.
+
+    Note: Python threads cannot be stopped. Timed out actions are abandoned,
+    an error is delivered instead and their late result is dropped.
+    Their threads are lost, so a new pool is started for the other jobs.
+    """
+
+    def __init__(self, deliver, notify=None, max_workers=None):
+        self.deliver = deliver
+        self.notify = notify
+        self.max_workers = max_workers or config.ACTION_WORKERS
+        self.executor = self.create_executor()
+        self.jobs = dict()  # key -> Job
+        self.detached_keys = itertools.count()
+        self.timer = None
+
+    def create_executor(self):
+        """New thread pool"""
+        return ThreadPoolExecutor(self.max_workers, thread_name_prefix="cliptools-action")
+
+    def submit(self, key, text, action, callback, errback=None):
+        """Run the action on the text in background, callback receives the result
+        Previous job with the same key is cancelled
+        errback receives the error message instead of an error text as result"""
+        self.cancel(key)
+        self.start(key, Job(text, action, callback, errback=errback))
+
+    def run_detached(self, text, action, callback, errback=None):
+        """Run the action like submit, but cancel_all does not cancel it
+        Used by queries, the selection does not affect them
+        errback receives the error message instead of an error text as result"""
+        key = ("detached", next(self.detached_keys))
+        self.start(key, Job(text, action, callback, detached=True, errback=errback))
+
+    def start(self, key, job):
+        """Submit the job to the pool"""
+        job.future = self.executor.submit(job.run)
+        self.jobs[key] = job
+        job.future.add_done_callback(lambda future: self.on_done(key, job, future))
+        self.start_timer()
+
+    def set_callback(self, key, callback):
+        """Change the callback of a waiting or running job"""
+        self.jobs[key].callback = callback
+
+    def is_running(self, key):
+        """Check whether a job with the key is waiting or running"""
+        return key in self.jobs
+
+    def cancel(self, key):
+        """Cancel the job if it is still waiting, drop its result anyway"""
+        job = self.jobs.pop(key, None)
+        if job is not None:
+            job.future.cancel()
+
+    def cancel_all(self):
+        """Cancel all jobs, used when the selection changes, detached ones are kept"""
+        for key, job in list(self.jobs.items()):
+            if not job.detached:
+                self.cancel(key)
+
+    def shutdown(self):
+        """Stop the runner, waiting jobs are cancelled"""
+        for key in list(self.jobs):
+            self.cancel(key)
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def on_done(self, key, job, future):
+        """Called in the worker thread, pass the result to the GUI thread"""
+        if not future.cancelled():
+            self.deliver(self.finish, key, job, future.result())
+
+    def finish(self, key, job, result):
+        """Called in the GUI thread, results of cancelled or timed out jobs are dropped"""
+        if self.jobs.get(key) is not job:
+            return
+        del self.jobs[key]
+        if job.error is not None:
+            job.fail(job.error)
+        else:
+            job.callback(result)
+        if self.notify and not job.detached:
+            self.notify()
+
+    def start_timer(self):
+        """Periodic watchdog while there are jobs, only one at a time
+        Submits do not touch it, so starting many jobs stays cheap"""
+        if self.timer is not None or not self.jobs:
+            return
+        self.timer = threading.Timer(
+            config.ACTION_WATCH_INTERVAL, self.deliver, (self.check_timeouts,)
+        )
+        self.timer.daemon = True
+        self.timer.start()
+
+    def check_timeouts(self):
+        """Called in the GUI thread, report the timed out jobs
+        Their threads are lost, a new pool is started for the waiting jobs"""
+        self.timer = None
+        now = time.monotonic()
+        # finished jobs are not expired, their result is being delivered
+        expired = [
+            key
+            for key, job in self.jobs.items()
+            if job.deadline is not None and job.deadline <= now and not job.future.done()
+        ]
+        for key in expired:
+            job = self.jobs.pop(key)
+            job.fail("timeout after {} s".format(job.timeout))
+        if expired:
+            self.replace_executor()
+        if expired and self.notify:
+            self.notify()
+        self.start_timer()
+
+    def replace_executor(self):
+        """Start a new pool, jobs still waiting in the old one are moved
+        Old pool ends when its timed out actions return, if ever"""
+        old = self.executor
+        self.executor = self.create_executor()
+        for key, job in list(self.jobs.items()):
+            if job.future.cancel():
+                self.start(key, job)
+        old.shutdown(wait=False)
@@ -0,0 +1,49 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Address rules of the app instance, shared by the server and the fast client
+
+Only the low level _socket is imported here, the client should start fast.
+"""
+
+import _socket
+import os
+import sys
+
+from cliptools import config
+
+
+def use_unix():
+    """Check whether the Unix domain socket transport should be used"""
+    if not hasattr(_socket, "AF_UNIX"):
+        return False
+    if config.TRANSPORT == "unix":
+        return True
+    return config.TRANSPORT == "auto" and sys.platform.startswith("linux")
+
+
+def get_runtime_dir(create=True):
+    """Per-user directory of the socket, created if needed
+    It should be accessible only by the user, otherwise OSError is raised
+    Without create the missing directory is accepted, the server would create it"""
+    path = os.environ.get("XDG_RUNTIME_DIR")
+    if not path or not os.path.isdir(path):
+        path = "/tmp/cliptools-{}".format(os.getuid())
+        if not create and not os.path.lexists(path):
+            return path
+        os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise OSError("Runtime directory is not private: " + path)
+    return path
+
+
+def get_address(create=True):
+    """Address of the app instance, socket path or (host, port) for TCP
+    Clients should not create the runtime directory, see get_runtime_dir"""
+    if use_unix():
+        try:
+            return os.path.join(get_runtime_dir(create), config.SOCKET_NAME)
+        except OSError:
+            pass
+    return ("localhost", config.PORT)
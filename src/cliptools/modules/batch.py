@@ -0,0 +1,131 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Batch mode, applying an action on the files of a directory tree
+
+Usage: cliptools batch ACTION DIR [--output OUT] [--pattern GLOB] [--workers N]
+ACTION is the name of the function, like accents_dewinize.
+Files are changed in place, or the results are written into the output
+directory with the same relative paths.
+
+Files are processed in parallel by a process pool, one process per core by
+default. Each file is streamed like in the pipe mode, and written into a
+temporary file first, so a failed action does not leave half written files.
+"""
+
+import argparse
+import os
+import pathlib
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cliptools.modules import data_struct, pipe
+
+
+TEMP_SUFFIX = ".cliptools-tmp"
+
+
+def process_file(action_name, source, target):
+    """Apply the action on a file, called in a worker process
+    Action is found by its name here, functions cannot be sent to the workers.
+    Return (size in bytes, seconds)"""
+    start = time.perf_counter()
+    action = data_struct.get_action(action_name)
+    size = source.stat().st_size
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(target.name + TEMP_SUFFIX)
+    try:
+        with (
+            open(source, encoding="utf-8", errors="surrogateescape", newline="") as infile,
+            open(temp, "w", encoding="utf-8", errors="surrogateescape", newline="") as outfile,
+        ):
+            for result in pipe.apply_stream(action, pipe.iter_chunks(infile)):
+                outfile.write(result)
+        shutil.copymode(source, temp)
+        os.replace(temp, target)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+    return size, time.perf_counter() - start
+
+
+def find_files(root, pattern, exclude=None):
+    """Files of the tree matching the pattern, the excluded directory is skipped
+    Paths are compared resolved, so relative or differently spelled ones match too"""
+    files = []
+    if exclude is not None:
+        exclude = exclude.resolve()
+    for path in root.rglob(pattern):
+        if not path.is_file() or path.name.endswith(TEMP_SUFFIX):
+            continue
+        if exclude is not None and path.resolve().is_relative_to(exclude):
+            continue
+        files.append(path)
+    return sorted(files)
+
+
+def format_speed(size, seconds):
+    """Throughput in MB/s"""
+    return "{:.1f} MB/s".format(size / max(seconds, 1e-9) / 1e6)
+
+
+def run(action_name, root, output=None, pattern="*.txt", workers=None):
+    """Process the files, report the progress on the standard output
+    Return the number of failed files"""
+    root = pathlib.Path(root)
+    output = pathlib.Path(output) if output is not None else None
+    files = find_files(root, pattern, exclude=output)
+    start = time.perf_counter()
+    total = 0
+    errors = 0
+    with ProcessPoolExecutor(workers) as executor:
+        futures = dict()
+        for source in files:
+            target = source if output is None else output / source.relative_to(root)
+            futures[executor.submit(process_file, action_name, source, target)] = source
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                size, seconds = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                print("ERROR {}: {}".format(source, exc), file=sys.stderr)
+                errors += 1
+                continue
+            total += size
+            print(
+                "{}: {} bytes, {:.3f} s, {}".format(
+                    source, size, seconds, format_speed(size, seconds)
+                )
+            )
+    seconds = time.perf_counter() - start
+    print(
+        "Processed {} files, {} bytes in {:.2f} s, {}".format(
+            len(files) - errors, total, seconds, format_speed(total, seconds)
+        )
+    )
+    return errors
+
+
+def main(args):
+    """Run the batch mode, return the exit code"""
+    parser = argparse.ArgumentParser(
+        prog="cliptools batch", description="Apply an action on the files of a directory tree"
+    )
+    parser.add_argument("action", help="name of the action, like accents_dewinize")
+    parser.add_argument("directory", help="root of the files to process")
+    parser.add_argument("--output", help="write the results here instead of changing the files")
+    parser.add_argument("--pattern", default="*.txt", help="file name pattern, default: *.txt")
+    parser.add_argument("--workers", type=int, help="number of processes, default: cores")
+    options = parser.parse_args(args)
+    try:
+        data_struct.get_action(options.action)
+    except RuntimeError as exc:
+        parser.error(str(exc))
+    if not os.path.isdir(options.directory):
+        parser.error("Not a directory: " + options.directory)
+    errors = run(
+        options.action, options.directory, options.output, options.pattern, options.workers
+    )
+    return 1 if errors else 0
@@ -0,0 +1,488 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Clipboard backends, reading and writing the system clipboard
+
+Pyperclip and wx backends read the clipboard at every poll. On Linux pyperclip
+starts a new xclip, xsel or wl-paste process for each read. Watch backend keeps
+one helper process running, that reports the clipboard changes through a pipe.
+Fake backend is an in-memory clipboard for tests.
+
+This module is also the X11 helper program of the watch backend, see main below.
+Only standard modules are imported at the top, it should start fast.
+"""
+
+import atexit
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+from collections import deque
+
+from cliptools import config
+
+
+# Frames of the helper process: 8 bytes length header and the UTF-8 text
+FRAME_HEADER = struct.Struct(">Q")
+
+# Chunk size of reading the terminated texts
+READ_SIZE = 65536
+
+
+def write_frame(stream, text):
+    """Write a text as a frame and flush the stream"""
+    data = text.encode("utf-8")
+    stream.write(FRAME_HEADER.pack(len(data)))
+    stream.write(data)
+    stream.flush()
+
+
+def read_exactly(stream, size):
+    """Read the given number of bytes, return None at the end of the stream"""
+    data = bytearray(size)
+    view = memoryview(data)
+    received = 0
+    while received < size:
+        count = stream.readinto(view[received:])
+        if not count:
+            return None
+        received += count
+    return bytes(data)
+
+
+def read_frame(stream):
+    """Read a text frame, return None at the end of the stream"""
+    header = read_exactly(stream, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    data = read_exactly(stream, size)
+    if data is None:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def iter_frames(stream):
+    """Texts of the frames on the stream until its end"""
+    while True:
+        text = read_frame(stream)
+        if text is None:
+            return
+        yield text
+
+
+def iter_terminated(stream, terminator=b"\0"):
+    """Texts ended by the terminator on the stream, an unfinished last one is dropped"""
+    buffer = bytearray()
+    searched = 0
+    while True:
+        chunk = stream.read1(READ_SIZE)
+        if not chunk:
+            return
+        buffer += chunk
+        end = buffer.find(terminator, searched)
+        while end >= 0:
+            yield buffer[:end].decode("utf-8", errors="replace")
+            del buffer[: end + 1]
+            end = buffer.find(terminator)
+        searched = len(buffer)
+
+
+def take_all(changes):
+    """Remove the items of the deque, safe while an other thread appends"""
+    return [changes.popleft() for _ in range(len(changes))]
+
+
+###########################################################
+#
+# The backends
+#
+###########################################################
+
+
+class ClipBackend:
+    """Base of the clipboard backends
+
+    sequence is increased at each known change, backends that cannot detect
+    changes keep it None.
+    """
+
+    sequence = None
+
+    def take_changes(self):
+        """Texts of the changes since the last call, oldest first
+        None if the backend does not queue the changes, it has to be polled then"""
+        return None
+
+    def paste(self):
+        """Return the text of the clipboard, empty string if not available"""
+        raise NotImplementedError
+
+    def copy(self, text):
+        """Copy the text to the clipboard, raise exception if not possible"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the resources"""
+        pass
+
+
+class PyperclipBackend(ClipBackend):
+    """Clipboard through pyperclip"""
+
+    def __init__(self):
+        import pyperclip  # pylint: disable=import-outside-toplevel
+
+        self.pyperclip = pyperclip
+
+    def paste(self):
+        """Read the clipboard, on Linux it starts a new process"""
+        try:
+            return self.pyperclip.paste()
+        except Exception:  # pylint: disable=broad-except
+            return ""
+
+    def copy(self, text):
+        """Copy the text to the clipboard"""
+        self.pyperclip.copy(text)
+
+
+class WxBackend(ClipBackend):
+    """Clipboard through wxPython, texts and file names are supported"""
+
+    def __init__(self):
+        import wx  # pylint: disable=import-outside-toplevel
+
+        self.wx = wx
+
+    def paste(self):
+        """Read the clipboard, file names are returned as lines"""
+        wx = self.wx
+        success_text = False
+        success_file = False
+        tdo_text = wx.TextDataObject()
+        tdo_file = wx.FileDataObject()
+        try:
+            if wx.TheClipboard.Open():
+                success_text = wx.TheClipboard.GetData(tdo_text)
+                if not success_text:
+                    success_file = wx.TheClipboard.GetData(tdo_file)
+                wx.TheClipboard.Close()
+            else:
+                # print("Unable to open the clipboard")
+                return ""
+        except Exception:  # pylint: disable=broad-except
+            # print("Unable to open the clipboard")
+            return ""
+        if success_text:
+            return tdo_text.GetText()
+        if success_file:
+            return "\n".join(tdo_file.GetFilenames())
+        return ""
+
+    def copy(self, text):
+        """Copy the text to the clipboard"""
+        wx = self.wx
+        tdo = wx.TextDataObject()
+        tdo.SetText(text)
+        if not wx.TheClipboard.Open():
+            raise RuntimeError("Unable to open the clipboard")
+        wx.TheClipboard.SetData(tdo)
+        wx.TheClipboard.Close()
+
+
+class FakeBackend(ClipBackend):
+    """In-memory clipboard for tests"""
+
+    def __init__(self, text=""):
+        self.text = text
+        self.sequence = 0
+        self.queue = deque()
+
+    def paste(self):
+        """Return the stored text"""
+        return self.text
+
+    def copy(self, text):
+        """Store the text, like an other application would do"""
+        self.text = text
+        self.sequence += 1
+        self.queue.append(text)
+
+    def take_changes(self):
+        """Texts copied since the last call"""
+        return take_all(self.queue)
+
+
+class WatchBackend(ClipBackend):
+    """Clipboard watched by a long-lived helper process
+
+    Helper writes a text at each clipboard change, a reader thread stores
+    the last text and queues the changes, so no clip is lost between the polls.
+    Reading the clipboard is then just returning that text.
+    Copying and reading after the helper died are done by the fallback backend.
+    texts is the parser of the helper output, iter_frames or iter_terminated.
+    """
+
+    def __init__(self, command, fallback, texts=iter_frames):
+        self.fallback = fallback
+        self.texts = texts
+        self.text = ""
+        self.changes = 0
+        self.queue = deque(maxlen=config.MAX_NUMBER_OF_DATA)
+        self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+            command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE
+        )
+        self.reader = threading.Thread(target=self.read_loop, daemon=True)
+        self.reader.start()
+        atexit.register(self.close)
+
+    def read_loop(self):
+        """Reader thread, runs until the helper exits"""
+        for text in self.texts(self.process.stdout):
+            self.text = text
+            self.queue.append(text)
+            self.changes += 1
+
+    @property
+    def sequence(self):
+        """Number of the reported changes, None when the fallback is used"""
+        if self.reader.is_alive():
+            return self.changes
+        return None
+
+    def take_changes(self):
+        """Texts reported since the last call, None when the fallback is used"""
+        alive = self.reader.is_alive()
+        changes = take_all(self.queue)
+        if alive or changes:
+            return changes
+        return None
+
+    def is_alive(self):
+        """Check whether the helper is still running"""
+        return self.process.poll() is None
+
+    def paste(self):
+        """Return the last reported text"""
+        if self.reader.is_alive():
+            return self.text
+        return self.fallback.paste()
+
+    def copy(self, text):
+        """Copy the text by the fallback, helper will report the change"""
+        self.fallback.copy(text)
+
+    def close(self):
+        """Stop the helper process"""
+        if self.is_alive():
+            self.process.kill()
+            self.process.wait()
+
+
+def get_watch_command():
+    """Command of the helper process for this system and the parser of its output
+    None if not available"""
+    if not sys.platform.startswith("linux"):
+        return None
+    if os.environ.get("WAYLAND_DISPLAY") and shutil.which("wl-paste"):
+        # wl-paste runs the command at each change with the text on the input,
+        # a shell and cat are much cheaper to start than a Python interpreter
+        command = ["sh", "-c", "cat; printf '\\0'"]
+        return [
+            "wl-paste",
+            "--no-newline",
+            "--type",
+            "text",
+            "--watch",
+            *command,
+        ], iter_terminated
+    if os.environ.get("DISPLAY"):
+        return [sys.executable, "-m", "cliptools.modules.clip_backends", "tk-watch"], iter_frames
+    return None
+
+
+def create_backend(name=None):
+    """Create the backend by its name, default is config.CLIP_BACKEND
+    auto: watch backend if available, else pyperclip or wx based on config.USE_PY_PER_CLIP"""
+    if name is None:
+        name = config.CLIP_BACKEND
+    if name == "fake":
+        return FakeBackend()
+    if name == "wx" or (name == "auto" and not config.USE_PY_PER_CLIP):
+        return WxBackend()
+    if name == "pyperclip":
+        return PyperclipBackend()
+    if name in ("auto", "watch"):
+        fallback = PyperclipBackend()
+        watch = get_watch_command()
+        if watch is None:
+            return fallback
+        command, texts = watch
+        try:
+            return WatchBackend(command, fallback, texts)
+        except OSError:
+            return fallback
+    raise RuntimeError("Unknown clipboard backend: " + name)
+
+
+class ClipPoller:
+    """Adaptive clipboard polling with change detection
+
+    Interval is the shortest after a change and grows when idle,
+    even more when the app is minimized.
+    Backends queueing the changes report every clip, however long the interval is.
+    Other backends keep only the current text, they are polled at least
+    every CLIP_POLL_UNQUEUED ms, so clips copied in a quick row are not lost.
+    Backends with sequence number are read only when the number changes,
+    so unchanged huge texts are not copied at all.
+    Other backends are read and compared to the last text.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.interval = config.CLIP_POLL_MIN
+        self.last_sequence = None
+        self.last_text = None
+        self.queued = False
+        self.pending = deque()
+
+    def poll(self, minimized=False):
+        """Check the clipboard, return the new text or None if there is no change
+        The interval for the next poll is updated"""
+        text = self.read_change()
+        if text is not None:
+            self.interval = config.CLIP_POLL_MIN
+        else:
+            limit = config.CLIP_POLL_MINIMIZED if minimized else config.CLIP_POLL_MAX
+            if not self.queued:
+                limit = min(limit, config.CLIP_POLL_UNQUEUED)
+            self.interval = min(self.interval * 3 // 2, limit)
+        return text
+
+    def read_change(self):
+        """Read the clipboard if it has changed"""
+        changes = self.backend.take_changes()
+        self.queued = changes is not None
+        if self.queued and self.last_text is not None:
+            self.pending.extend(changes)
+            while self.pending:
+                text = self.pending.popleft()
+                if text != self.last_text:
+                    self.last_text = text
+                    return text
+            return None
+        # first read, or the backend is polled
+        sequence = self.backend.sequence
+        if sequence is not None:
+            if sequence == self.last_sequence:
+                return None
+            self.last_sequence = sequence
+        text = self.backend.paste()
+        if text == self.last_text:
+            return None
+        self.last_text = text
+        return text
+
+
+_backend = None  # pylint: disable=invalid-name
+
+
+def get_backend():
+    """The backend used by the app, created at the first use"""
+    global _backend  # pylint: disable=global-statement
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend):
+    """Replace the backend used by the app, for example with a fake one in tests"""
+    global _backend  # pylint: disable=global-statement
+    _backend = backend
+
+
+###########################################################
+#
+# Helper program of the watch backend
+#
+###########################################################
+
+
+class StampedReader:
+    """Read the text only when the selection stamp has changed
+    Stamp is the X11 TIMESTAMP of the clipboard ownership, it is cheap to get.
+    Without stamp (not supported or no owner) the text is read at each check."""
+
+    def __init__(self, read_stamp, read_text):
+        self.read_stamp = read_stamp
+        self.read_text = read_text
+        self.last_stamp = None
+        self.last_text = None
+
+    def check(self):
+        """Return the new text, None if there is no change"""
+        stamp = self.read_stamp()
+        if stamp is not None and stamp == self.last_stamp:
+            return None
+        self.last_stamp = stamp
+        text = self.read_text()
+        if text == self.last_text:
+            return None
+        self.last_text = text
+        return text
+
+
+def helper_tk_watch():
+    """Watch the X11 clipboard by tkinter, report the changes
+    Reading the selection by Tk is cheap, no new process is started,
+    the text itself is transferred only when the owner stamp changes"""
+    import tkinter  # pylint: disable=import-outside-toplevel
+
+    root = tkinter.Tk()
+    root.withdraw()
+    parent = os.getppid()
+
+    def read_stamp():
+        try:
+            return root.selection_get(selection="CLIPBOARD", type="TIMESTAMP")
+        except tkinter.TclError:
+            return None
+
+    def read_text():
+        try:
+            return root.clipboard_get()
+        except tkinter.TclError:
+            return ""
+
+    reader = StampedReader(read_stamp, read_text)
+
+    def poll():
+        if os.getppid() != parent:
+            root.destroy()  # the app has exited
+            return
+        text = reader.check()
+        if text is not None:
+            try:
+                write_frame(sys.stdout.buffer, text)
+            except OSError:
+                root.destroy()
+                return
+        root.after(config.CLIP_WATCH_INTERVAL, poll)
+
+    poll()
+    root.mainloop()
+
+
+def main(args):
+    """Run the helper given in the arguments"""
+    if args == ["tk-watch"]:
+        helper_tk_watch()
+    else:
+        sys.exit("Usage: clip_backends tk-watch")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
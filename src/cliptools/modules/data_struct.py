@@ -4,10 +4,12 @@ with a lines based GUI interface
 Definition of data structures used to store text and action data
 """
 
-from functools import wraps
+from collections import deque
+from functools import partial, wraps
+from itertools import islice
 
 from cliptools import config
-from cliptools.modules import utils
+from cliptools.modules import action_runner, preview_cache, utils
 
 
 class BaseData:
@@ -15,12 +17,14 @@ class BaseData:
 
     def __init__(self, name, contents=None):
         self.name = name
+        # deque is used as a ring buffer, adding and removing at both ends is O(1)
+        # and indexing near the ends, i.e. the visible pages, is also fast
         if contents:
             # at creation size is not checked
             # user may want to create large data sets
-            self.contents = list(contents)
+            self.contents = deque(contents)
         else:
-            self.contents = list()
+            self.contents = deque()
         self.location = 0  # used for page up-down, where are we
         self.focus = 0  # what is in focus, from 0 to config.NUMBER_OF_ROWS - 1
 
@@ -33,11 +37,11 @@ class BaseData:
         if end:
             self.contents.append(content)
             if len(self.contents) > config.MAX_NUMBER_OF_DATA:
-                del self.contents[0]
+                self.drop_content(self.contents.popleft())
         else:
-            self.contents.insert(0, content)
+            self.contents.appendleft(content)
             if len(self.contents) > config.MAX_NUMBER_OF_DATA:
-                del self.contents[-1]
+                self.drop_content(self.contents.pop())
             if self.location == 0:
                 # if first data is on page, keep it, data moves
                 if 0 < self.focus < config.NUMBER_OF_ROWS - 1:
@@ -49,6 +53,10 @@ class BaseData:
                 # else page will keep the same data, collecting before existing
                 self.location += 1
 
+    def drop_content(self, content):
+        """Called when an item is evicted from the contents, children can override"""
+        pass
+
     def page_up(self):
         """Page up in the contents"""
         if self.location == 0:
@@ -69,6 +77,14 @@ class BaseData:
             if self.location + self.focus >= len(self.contents):
                 self.focus = len(self.contents) - self.location - 1
 
+    def set_focus_index(self, index):
+        """Set the focus to the item by its index in the contents, page if needed"""
+        if not 0 <= index < len(self.contents):
+            return  # no change if out of range
+        if not self.location <= index < self.location + config.NUMBER_OF_ROWS:
+            self.location = index - index % config.NUMBER_OF_ROWS
+        self.focus = index - self.location
+
     def set_focus(self, number):
         """Set the focus to the given line, check available data"""
         if 0 <= number < config.NUMBER_OF_ROWS and self.location + number < len(self.contents):
@@ -94,10 +110,17 @@ class BaseData:
             return self.contents[self.location + number]
         raise IndexError()
 
-    def get_name(self, number, text=""):  # pylint: disable=unused-argument
-        """Get the name to represent the content, default is short version
+    def get_name(self, number, text=""):
+        """Get the name to represent the content taking into account the location
         text can be used for actions, not used for simple texts"""
-        return utils.limit_text(self.get_content(number))
+        if 0 <= number < config.NUMBER_OF_ROWS:
+            return self.get_item_name(self.location + number, text)
+        raise IndexError()
+
+    def get_item_name(self, index, text=""):  # pylint: disable=unused-argument
+        """Get the name of any item by its index in the contents, default is short version
+        Virtual list view is using it directly"""
+        return utils.limit_text(self.contents[index])
 
     def get_names(self, text=""):
         """Iterator, returning the context. Return empty strings if not enough data.
@@ -120,6 +143,145 @@ class TextData(BaseData):
         super().add_content(content, end=end)
 
 
+class ClipStore:
+    """Hash indexed storage of the clipboard history, each text is stored only once
+
+    It behaves like the deque of the other data, index 0 is the newest clip.
+    The deque keeps the positions, so indexing the pages is as fast as before,
+    the dict counts the texts, so checking a text is O(1).
+    Moving a re-copied text to the start searches it from the start,
+    usually it was copied recently, so it is found soon.
+    List-like changes of the shell, like append or remove, are supported too.
+    """
+
+    def __init__(self, contents=None):
+        self.items = deque()
+        self.counts = dict()  # text -> number of occurrences
+        if contents:
+            for text in contents:
+                if text not in self.counts:
+                    self.append(text)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __reversed__(self):
+        return reversed(self.items)
+
+    def __contains__(self, text):
+        return text in self.counts
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self.items)[index]
+        try:
+            return self.items[index]
+        except IndexError:
+            raise IndexError("clip index out of range") from None
+
+    def __setitem__(self, index, text):
+        old = self.items[index]
+        self.items[index] = text
+        self.forget(old)
+        self.counts[text] = self.counts.get(text, 0) + 1
+
+    def __delitem__(self, index):
+        old = self.items[index]
+        del self.items[index]
+        self.forget(old)
+
+    def __repr__(self):
+        return "ClipStore({!r})".format(list(self))
+
+    def forget(self, text):
+        """Decrease the count of a removed text"""
+        count = self.counts[text] - 1
+        if count:
+            self.counts[text] = count
+        else:
+            del self.counts[text]
+
+    def index(self, text, stop=None):
+        """Position of the text, searching only the first stop items, None if not found"""
+        if text not in self.counts:
+            return None
+        for number, item in enumerate(islice(self.items, stop)):
+            if item == text:
+                return number
+        return None
+
+    def append(self, text):
+        """Add the text as the oldest clip"""
+        self.items.append(text)
+        self.counts[text] = self.counts.get(text, 0) + 1
+
+    def appendleft(self, text):
+        """Add the text as the newest clip, an existing one is moved, not duplicated"""
+        if text in self.counts:
+            self.items.remove(text)
+        else:
+            self.counts[text] = 1
+        self.items.appendleft(text)
+
+    def remove(self, text):
+        """Remove the first occurrence of the text"""
+        self.items.remove(text)
+        self.forget(text)
+
+    def pop(self):
+        """Remove and return the oldest clip"""
+        text = self.items.pop()
+        self.forget(text)
+        return text
+
+
+class ClipData(TextData):
+    """Clipboard history storage structure, content is a ClipStore of strings
+
+    Re-copied texts are moved to the start instead of adding duplicates.
+    """
+
+    def __init__(self, name, contents=None):
+        super().__init__(name)
+        self.contents = ClipStore(contents)
+
+    def add_content(self, content, end=None):  # noqa: ARG002 pylint: disable=unused-argument
+        """Add a clip to the start and handle size, location
+        Note: end is accepted for compatibility, clips are always added to the start"""
+        if content not in self.contents:
+            super().add_content(content, end=False)
+            return
+        # Known clip, only the focus and location bookkeeping depends on its position
+        page_end = self.location + config.NUMBER_OF_ROWS
+        number = self.contents.index(content, page_end)
+        if number is None:
+            # it was after the page, so for the page it is like a new item
+            super().add_content(content, end=False)
+            return
+        self.contents.appendleft(content)
+        if number < self.location:
+            return  # it was before the page, page is not changed
+        focused = self.location + self.focus
+        if self.location == 0:
+            # it was on the first page, focus will keep the same data
+            if self.focus == number:
+                self.focus = 0
+            elif 0 < self.focus < number:
+                self.focus += 1
+        elif focused == number:
+            # focused clip moved to the start, follow it
+            self.location = 0
+            self.focus = 0
+        else:
+            # clips before it moved down by one, page will keep them
+            self.location += 1
+            if focused > number:
+                self.focus -= 1
+
+
 class ActionData(BaseData):
     """Action, i.e. text processing tools data storage structure
     Content are (name, action) tuples
@@ -128,23 +290,32 @@ class ActionData(BaseData):
     init not checking duplicates
     """
 
+    def __init__(self, name, contents=None):
+        super().__init__(name, contents)
+        # name -> action index, to check duplicates in O(1)
+        self.by_name = dict(self.contents)
+
     def add_content(self, content, end=True):
         """Add an item to the contents and handle size, location, avoid duplicates"""
-        name, action = content  # pylint: disable=unused-variable
-        if name in (item[0] for item in self.contents):
+        name, action = content
+        if name in self.by_name:
             raise RuntimeError("Redeclaration of " + name)
         super().add_content(content, end=end)
+        self.by_name[name] = action
+
+    def drop_content(self, content):
+        """Override: keep the name index in sync"""
+        self.by_name.pop(content[0], None)
 
     def get_content(self, number):
         """Get the action from the content taking into account the location"""
         content = super().get_content(number)
         return content[1]
 
-    def get_name(self, number, text=""):
+    def get_item_name(self, index, text=""):
         """Get the name to represent the content, here applying the action"""
-        content = super().get_content(number)
-        name, action = content
-        result = utils.safe_action(text, action)
+        name, action = self.contents[index]
+        result = get_preview(action, text)
         result = utils.limit_text(result)
         result = "{}: {}".format(name, result)
         return result
@@ -153,17 +324,36 @@ class ActionData(BaseData):
 class DataCollection(BaseData):
     """Collection will store multiple data storage instances"""
 
-    def get_name(self, number, text=""):
+    def __init__(self, name, contents=None):
+        super().__init__(name, contents)
+        # name -> data index, first one wins in case of same names
+        self.by_name = dict()
+        for content in self.contents:
+            self.by_name.setdefault(content.name, content)
+
+    def get_item_name(self, index, text=""):
         """Get the name to represent the content, here name of the content"""
-        content = super().get_content(number)
-        return content.name
+        return self.contents[index].name
+
+    def add_content(self, content, end=True):
+        """Add an item to the contents and handle size, location, keep the name index"""
+        super().add_content(content, end=end)
+        if end:
+            self.by_name.setdefault(content.name, content)
+        else:
+            self.by_name[content.name] = content
+
+    def drop_content(self, content):
+        """Override: keep the name index in sync"""
+        if self.by_name.get(content.name) is content:
+            del self.by_name[content.name]
 
     def get_content_by_name(self, name):
         """Find the data structure by the name"""
-        for content in self.contents:
-            if content.name == name:
-                return content
-        raise RuntimeError("Name not found: " + name)
+        try:
+            return self.by_name[name]
+        except KeyError:
+            raise RuntimeError("Name not found: " + name) from None
 
 
 class DataCollections:
@@ -171,7 +361,7 @@ class DataCollections:
     self.clip is a special data, it will store clipboard texts"""
 
     def __init__(self):
-        self.clip = TextData("clips", [""])
+        self.clip = ClipData("clips", [""])
 
         self.texts = DataCollection("text groups")
         self.texts.add_content(self.clip)
@@ -183,10 +373,106 @@ class DataCollections:
 # defined here at module level so decorator can refer to it
 data_collections = DataCollections()  # pylint: disable=invalid-name
 
+# cache of action results shown as row names, rendering the same page again is free
+action_previews = preview_cache.PreviewCache()  # pylint: disable=invalid-name
+
+# background runner of the previews, set by the controller
+# if not set previews are computed immediately
+preview_runner = None  # pylint: disable=invalid-name
+
+# errors of the background previews, they are not cached, see fail_preview
+preview_errors = dict()  # pylint: disable=invalid-name
+
+
+def get_preview(action, text):
+    """Get the result of the action on the text to show in a row
+    Cached results are reused, new ones are computed in the background if possible,
+    then a placeholder is returned until the result arrives"""
+    result = action_previews.get(action, text)
+    if result is not None:
+        return result
+    if getattr(action, "prefix_safe", False):
+        # only the start is displayed, no need to process the entire text
+        action_text = utils.text_prefix(text)
+    else:
+        action_text = text
+    if preview_runner is None:
+        result = utils.safe_action(action_text, action)
+        return store_preview(action, text, result)
+    key = ("preview", action, hash(text))
+    if key in preview_errors:
+        return preview_errors[key]
+    if not preview_runner.is_running(key):
+        preview_runner.submit(
+            key,
+            action_text,
+            action,
+            partial(store_preview, action, text),
+            partial(fail_preview, key),
+        )
+    return action_runner.COMPUTING
+
+
+def store_preview(action, text, result):
+    """Store the start of the result in the cache, that is enough for the rows
+    so the previews of huge texts also fit in the cache"""
+    result = utils.text_prefix(result)
+    action_previews.put(action, text, result)
+    return result
+
+
+def fail_preview(key, message):
+    """Show the error of the preview until the next selection
+    A timeout may depend on the load, so it is not cached, the next selection retries it"""
+    preview_errors[key] = "ERROR: {}".format(message)
+
+
+def precompute_previews(text, actions):
+    """Start computing the previews of all actions on the text in the background
+    Visible pages of the action groups are the first, the others follow"""
+    if preview_runner is None:
+        return
+    preview_errors.clear()
+    rest = []
+    for group in actions.contents:
+        page_end = group.location + config.NUMBER_OF_ROWS
+        for number, (_, action) in enumerate(group.contents):
+            if group.location <= number < page_end:
+                get_preview(action, text)
+            else:
+                rest.append(action)
+    for action in rest:
+        get_preview(action, text)
 
-def register_function(action_func):
+
+def get_action(full_name):
+    """Find a registered action by its function name, i.e. <dataname>_<functionname>"""
+    data_name, _, func_name = full_name.partition("_")
+    data = data_collections.actions.get_content_by_name(data_name)
+    try:
+        return data.by_name[func_name]
+    except KeyError:
+        raise RuntimeError("Name not found: " + full_name) from None
+
+
+def register_function(action_func=None, *, prefix_safe=False, timeout=None):
     """Decorator, that will store the functions in actions data
-    function name should be <dataname>_<functionname>"""
+    function name should be <dataname>_<functionname>
+
+    Use @register_function(prefix_safe=True) if the action on the start of a text
+    gives the start of the result, i.e. it works character by character.
+    Then the previews are computed only on the start of the text.
+    Use timeout=<seconds> to change the default config.ACTION_TIMEOUT.
+
+    Actions get a stream method too, it takes an iterable of text chunks and yields
+    the results, so large inputs can be processed with bounded memory. By default
+    the chunks are cut at line ends, see utils.stream_action. An action can provide
+    its own streaming variant, that handles its chunk boundaries:
+
+    @<action>.streaming
+    def <action>_stream(chunks): ..."""
+    if action_func is None:
+        return partial(register_function, prefix_safe=prefix_safe, timeout=timeout)
     data_name, func_name = action_func.__name__.split("_", 1)
     try:
         data = data_collections.actions.get_content_by_name(data_name)
@@ -198,6 +484,15 @@ def register_function(action_func):
     def wrapper(*args, **kwds):
         return action_func(*args, **kwds)
 
+    def streaming(stream_func):
+        """Decorator, that will set the streaming variant of the action"""
+        wrapper.stream = stream_func
+        return stream_func
+
+    wrapper.prefix_safe = prefix_safe
+    wrapper.timeout = timeout
+    wrapper.stream = partial(utils.stream_action, wrapper)
+    wrapper.streaming = streaming
     content = (func_name, wrapper)
     data.add_content(content)
     return wrapper
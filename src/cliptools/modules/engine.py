@@ -0,0 +1,564 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Engine part, the states of the app driving the Data without any GUI
+Renderer is the interface to the GUI, the default one is headless
+"""
+
+import queue
+import time
+
+from cliptools.modules import (
+    action_runner,
+    clip_backends,
+    data_loader,
+    data_struct,
+    server,
+    text_functions,  # pylint: disable=unused-import
+)
+
+
+# states of the app
+TEXTS = 1
+TEXT = 2
+ACTIONS = 3
+ACTION = 4
+
+
+###########################################################
+#
+# The Renderer class, headless interface of the GUI
+#
+###########################################################
+
+
+class Renderer:
+    """Headless renderer, the GUI app provides the same methods
+
+    Calls of other threads are queued and executed by the main loop,
+    like wx.CallAfter does. Clipboard is polled by the main loop too.
+    """
+
+    def __init__(self):
+        self.calls = queue.Queue()
+        self.running = False
+        self.handle_update_request = None
+
+    def register_callbacks(
+        self,
+        handle_keyboard_events,  # pylint: disable=unused-argument
+        handle_focus_event,  # pylint: disable=unused-argument
+        handle_new_text,  # pylint: disable=unused-argument
+        handle_update_request,
+        handle_select_event,  # pylint: disable=unused-argument
+    ):
+        """Callbacks coming from engine, only clipboard updates are used headless"""
+        self.handle_update_request = handle_update_request
+
+    def call_after(self, func, *args):
+        """Call the function in the main loop, can be used from other threads"""
+        self.calls.put((func, args))
+
+    def process_pending(self):
+        """Execute the queued calls, return the number of them"""
+        count = 0
+        while True:
+            try:
+                func, args = self.calls.get_nowait()
+            except queue.Empty:
+                return count
+            func(*args)
+            count += 1
+
+    def main_loop(self):
+        """Execute the queued calls and poll the clipboard until stopped"""
+        poller = clip_backends.ClipPoller(clip_backends.get_backend())
+        next_poll = time.monotonic()
+        self.running = True
+        while self.running:
+            try:
+                func, args = self.calls.get(timeout=max(next_poll - time.monotonic(), 0))
+            except queue.Empty:
+                text = poller.poll()
+                if text is not None:
+                    self.handle_update_request(text)
+                next_poll = time.monotonic() + poller.interval / 1000
+                continue
+            func(*args)
+
+    def stop(self):
+        """Stop the main loop, can be used from other threads"""
+        self.call_after(setattr, self, "running", False)
+
+    def update_data(self, title, data, selected_text, action_doc, processed_text, auto_proc):
+        """Show the data, nothing to show headless"""
+        pass
+
+    def minimize(self):
+        """Minimize window, nothing to do headless"""
+        pass
+
+    def bring_to_front(self):
+        """Bring window to front, nothing to do headless"""
+        pass
+
+    def show_info(self):
+        """Display program info, nothing to do headless"""
+        pass
+
+    def show_error(self, msg):
+        """Error message to show, printed headless"""
+        print(msg)
+
+    def show_hide_details_panel(self):
+        """Show / hide details panel, nothing to do headless"""
+        pass
+
+    def focus_details_panel(self):
+        """Focus the details panel, nothing to do headless"""
+        pass
+
+    def show_hide_shell_panel(self):
+        """Show / hide shell panel, nothing to do headless"""
+        pass
+
+    def focus_shell_panel(self):
+        """Focus the shell, nothing to do headless"""
+        pass
+
+
+###########################################################
+#
+# The Engine class
+#
+###########################################################
+
+
+class Engine:
+    """Engine class, driving the Data and a renderer
+
+    Renderer can be the GUI app or the headless Renderer above.
+    Server socket is optional, if given the commands of newer instances are handled.
+    """
+
+    def __init__(self, renderer, server_socket=None, init_args=()):
+        self.renderer = renderer
+        self.server_socket = server_socket
+        self.server_queue = queue.Queue()
+        self.server = None
+        for item in init_args:
+            self.server_queue.put(item)
+        self.last_clip = ""
+
+        self.data = data_struct.data_collections
+        self.load_data()
+        self.renderer.register_callbacks(
+            self.handle_keyboard_events,
+            self.handle_focus_event,
+            self.handle_new_text,
+            self.handle_update_request,
+            self.handle_select_event,
+        )
+        # Actions run in background, results are delivered to the GUI thread
+        self.runner = action_runner.ActionRunner(self.renderer.call_after, self.update_app)
+        data_struct.preview_runner = self.runner
+
+        self.step = TEXTS
+        self.actual = self.data.texts
+        self.selected_text_data = None
+        self.selected_text = ""  # default text is empty text
+        self.selected_action_data = None
+        self.selected_action = text_functions.paste_paste
+        self.auto_proc = False
+        self.processed_text = ""
+        self.processed_for = None  # (text, action) of the processed text or its job
+        self.text_to_clipboard = ""
+        self.render_pending = False
+
+        # Actual commands for key or button press are defined here
+        self.keyboard_commands = {
+            "0": self.renderer.minimize,
+            "A": self.command_backward,
+            "D": self.command_forward,
+            "W": self.command_focus_up,
+            "S": self.command_focus_down,
+            "E": self.command_page_down,
+            "Q": self.command_page_up,
+            "F": self.renderer.bring_to_front,
+            "C": self.command_copy_selected_text,
+            "V": self.command_copy_processed_text,
+            "I": self.renderer.show_info,
+            "Z": self.renderer.show_hide_details_panel,
+            "X": self.renderer.focus_details_panel,
+            "M": self.renderer.show_hide_shell_panel,
+            "N": self.renderer.focus_shell_panel,
+            "T": self.command_test,
+            "P": self.command_auto_proc,
+        }
+
+        # Queries of scripts, coming through the server
+        self.queries = {
+            "clip": self.query_clip,
+            "search": self.query_search,
+            "apply": self.query_apply,
+            "groups": self.query_groups,
+        }
+
+    def start(self):
+        """Start the thread for delegation check and the main loop of the renderer"""
+        if self.server_socket is not None:
+            self.server = server.init_server_loop(
+                self.server_socket, self.server_queue, self.wake_up
+            )
+        self.renderer.call_after(self.handle_server_queue)  # command line commands
+        self.update_app()
+        self.renderer.main_loop()
+
+    def close(self):
+        """Stop the background work, used when the engine is not needed any more"""
+        self.runner.shutdown()
+        if self.server is not None:
+            self.server.stop()
+        if data_struct.preview_runner is self.runner:
+            data_struct.preview_runner = None
+
+    def load_data(self):
+        """Load available personal or sample text data
+        data is shared, groups loaded by an earlier engine are kept"""
+        for name, data in data_loader.load_data().items():
+            if name not in self.data.texts.by_name:
+                self.data.texts.add_content(data_struct.TextData(name, data))
+
+    ###########################################################
+    # Handlers are callbacks, renderer will call them
+    ###########################################################
+
+    def handle_keyboard_events(self, key):
+        """Function to handle commands, main source are GUI keyboard events,
+        but it handles command line commands too"""
+        if key in self.keyboard_commands:
+            self.keyboard_commands[key]()  # call the command
+        elif key.isdecimal():
+            number = int(key) - 1
+            try:
+                self.get_next(number)
+                self.get_focus()
+            except IndexError:
+                return  # not valid number, just ignore
+        else:
+            return  # unknown character, just ignore
+        self.update_app()
+
+    def handle_focus_event(self, num_text):
+        """Function to handle focus changes on the GUI
+        it is a helper for the user to show the details of selected items"""
+        try:
+            number = int(num_text) - 1
+            self.actual.set_focus(number)
+            self.get_focus()
+        except (ValueError, IndexError):
+            return  # not a valid number, return
+        self.update_app()
+
+    def handle_select_event(self, index):
+        """Function to handle selection in the virtual list
+        index is the position in the entire data, not only in the page"""
+        self.actual.set_focus_index(index)
+        try:
+            self.get_focus()
+        except IndexError:
+            return  # not a valid item, return
+        self.update_app()
+
+    def handle_new_text(self, text):
+        """Function to handle texts changed by the user
+        User can change the selected text or work with the shell"""
+        if text and text != self.selected_text:
+            self.data.clip.add_content(text)
+            self.select_text(text)
+            self.get_processed()
+            # self.text_to_clipboard = text
+            # self.set_clip_content(text)
+            self.update_app()
+
+    def handle_update_request(self, text):
+        """Function to handle texts coming from the clipboard
+        Right now GUI mainloop is checking periodically the clipboard.
+        This function is then called."""
+        if text and text != self.last_clip and text != self.text_to_clipboard:
+            # new text arrived
+            self.data.clip.add_content(text)
+            self.last_clip = text
+            if self.auto_proc:
+                self.select_text(text)
+                self.copy_processed(minimize=False)
+            if self.step == TEXT and self.actual == self.data.clip:
+                # clips are shown, update needed
+                if self.data.clip.is_first_selected():
+                    # first text selected and it is changing, so process it
+                    self.select_text(text)
+                    self.get_processed()
+                self.update_app()
+
+    def handle_server_queue(self):
+        """Function to handle the commands delegated by other instances
+        Commands are keys, ("text", text) pairs for texts to collect
+        or ("query", request, reply) for queries of scripts"""
+        while not self.server_queue.empty():
+            cmd = self.server_queue.get_nowait()
+            if not isinstance(cmd, tuple):
+                self.handle_keyboard_events(cmd)
+            elif cmd[0] == "query":
+                self.handle_query(*cmd[1:])
+            else:
+                self.handle_update_request(cmd[1])
+
+    def wake_up(self):
+        """Called by the server thread, commands are processed in the GUI thread"""
+        self.renderer.call_after(self.handle_server_queue)
+
+    ###########################################################
+    # Update is pushing the data to the renderer
+    ###########################################################
+
+    def update_app(self):
+        """Function to request updates of the GUI
+        sources can be keyboard events, delegation requests or clipboard changes
+        Requests are coalesced, GUI is updated at most once per event loop turn"""
+        if not self.render_pending:
+            self.render_pending = True
+            self.renderer.call_after(self.render)
+
+    def render(self):
+        """Function to push the data to the GUI, called by the event loop"""
+        self.render_pending = False
+        title = "Select from " + self.actual.name
+        self.renderer.update_data(
+            title,
+            self.actual,
+            self.selected_text,
+            self.selected_action.__doc__,
+            self.processed_text,
+            self.auto_proc,
+        )
+
+    ###########################################################
+    # Functions to modify the states of the controller and data
+    ###########################################################
+
+    def get_focus(self):
+        """Get the selected text and/or processed text based on the focus"""
+        item = self.actual.get_focused_content()
+        if self.step == TEXTS:
+            pass
+        elif self.step == TEXT:
+            self.select_text(item)
+        elif self.step == ACTIONS:
+            pass
+        elif self.step == ACTION:
+            self.selected_action = item
+        self.get_processed()
+
+    def get_next(self, number):
+        """Step to the next state, select the n-th item for that
+        If number is out of possible range this will raise IndexError
+        Usually get_focus should follow this function to finish the updates"""
+        item = self.actual.get_content(number)
+        self.actual.set_focus(number)
+        if self.step == TEXTS:
+            self.selected_text_data = item
+            self.actual = self.selected_text_data
+            self.step = TEXT
+        elif self.step == TEXT:
+            self.select_text(item)
+            # next pages will show the actions, start the previews now
+            data_struct.precompute_previews(item, self.data.actions)
+            self.actual = self.data.actions
+            self.step = ACTIONS
+        elif self.step == ACTIONS:
+            self.selected_action_data = item
+            self.actual = self.selected_action_data
+            self.step = ACTION
+        elif self.step == ACTION:
+            self.selected_action = item
+            self.actual = self.selected_text_data  # go back to selected text collection
+            self.step = TEXT
+            self.copy_processed()
+
+    def select_text(self, text):
+        """Change the selected text, background work on the previous one is dropped"""
+        if text is not self.selected_text:
+            self.runner.cancel_all()
+        self.selected_text = text
+
+    def set_clip_content(self, text):
+        """Copy a text to the clipboard, it will not be collected as a new clip"""
+        self.text_to_clipboard = text
+        try:
+            clip_backends.get_backend().copy(text)
+        except Exception:  # pylint: disable=broad-except
+            self.renderer.show_error("Unable to open the clipboard, try again.")
+
+    def get_processed(self):
+        """Update processed text in the background
+        a placeholder is shown until the result arrives
+        The job already running on the same text and action is kept"""
+        selected = (self.selected_text, self.selected_action)
+        if self.runner.is_running("processed") and self.processed_for == selected:
+            return
+        self.processed_text = action_runner.COMPUTING
+        self.processed_for = selected
+        self.runner.submit(
+            "processed", self.selected_text, self.selected_action, self.set_processed
+        )
+
+    def copy_processed(self, minimize=True):
+        """Copy the processed text to the clipboard, and minimize if requested
+        A ready result is copied at once, else it is done when the background
+        processing finishes, the GUI is not blocked meanwhile"""
+
+        def copy(result):
+            self.set_processed(result)
+            self.set_clip_content(result)
+            if minimize:
+                self.renderer.minimize()
+
+        ready = self.processed_text is not action_runner.COMPUTING
+        if ready and self.processed_for == (self.selected_text, self.selected_action):
+            copy(self.processed_text)
+            return
+        self.get_processed()
+        self.runner.set_callback("processed", copy)
+
+    def set_processed(self, result):
+        """Callback of the background processing"""
+        self.processed_text = result
+
+    def get_prev(self):
+        """Step back one state
+        Usually get_focus should follow this function to finish the updates"""
+        if self.step == ACTION:
+            self.actual = self.data.actions
+            self.step = ACTIONS
+        elif self.step == ACTIONS:
+            self.actual = self.selected_text_data
+            self.step = TEXT
+        elif self.step == TEXT:
+            self.actual = self.data.texts
+            self.step = TEXTS
+        elif self.step == TEXTS:
+            pass  # cannot go back from texts state
+
+    ###########################################################
+    # Commands contain the details of user commands
+    ###########################################################
+
+    def command_focus_down(self):
+        """Action to select the next item, move the focus down"""
+        self.actual.focus_down()
+        self.get_focus()
+
+    def command_focus_up(self):
+        """Action to select the previous item, move the focus up"""
+        self.actual.focus_up()
+        self.get_focus()
+
+    def command_page_up(self):
+        """Action to page up in the list"""
+        self.actual.page_up()
+        self.get_focus()
+
+    def command_page_down(self):
+        """Action to page up in the list"""
+        self.actual.page_down()
+        self.get_focus()
+
+    def command_backward(self):
+        """Go backward, go to the previous state"""
+        try:
+            self.get_prev()
+            self.get_focus()
+        except IndexError:
+            return  # not possible, but better to handle it
+
+    def command_forward(self):
+        """Go forward, use the actual selection and go to the next state"""
+        try:
+            self.get_next(self.actual.focus)
+            self.get_focus()
+        except IndexError:
+            return  # not possible, but better to handle it
+
+    def command_copy_selected_text(self):
+        """Action to copy the selected text and minimize"""
+        self.set_clip_content(self.selected_text)
+        self.actual = self.selected_text_data  # go back to selected text collection
+        self.step = TEXT
+        self.renderer.minimize()
+
+    def command_copy_processed_text(self):
+        """Action to copy the processed text and minimize"""
+        self.actual = self.selected_text_data  # go back to selected text collection
+        self.step = TEXT
+        self.copy_processed()
+
+    def command_test(self):
+        """Action to perform something to test & debug"""
+        self.renderer.show_error("Test message")
+
+    def command_auto_proc(self):
+        """Switching automatic processing"""
+        self.auto_proc = not self.auto_proc
+
+    ###########################################################
+    # Queries answer the scripts, results are sent back by reply
+    ###########################################################
+
+    def handle_query(self, request, reply):
+        """Function to handle the queries of scripts
+        request is the query name and the arguments, reply is called with
+        the result or with error=message"""
+        name, *args = request
+        if name not in self.queries:
+            reply(error="Unknown query: {}".format(name))
+            return
+        try:
+            self.queries[name](reply, *args)
+        except Exception as exc:  # pylint: disable=broad-except
+            # scripts can send anything, the main loop should survive it
+            reply(error="{}: {}".format(name, exc))
+
+    def query_clip(self, reply, number=0):
+        """Return the n-th clip, 0 is the newest one"""
+        reply(self.data.clip.contents[int(number)])
+
+    def query_search(self, reply, pattern, limit=None):
+        """Return the [number, clip] pairs of the clips containing the pattern,
+        case is ignored"""
+        if not isinstance(pattern, str):
+            raise TypeError("pattern should be a string")
+        pattern = pattern.casefold()
+        found = []
+        for number, text in enumerate(self.data.clip.contents):
+            if limit is not None and len(found) >= int(limit):
+                break
+            if pattern in text.casefold():
+                found.append([number, text])
+        reply(found)
+
+    def query_apply(self, reply, action_name, text):
+        """Return the result of the action on the text, action is given like case_upper
+        It runs in the background, the GUI is not blocked
+        Failure or timeout of the action is an error answer"""
+        if not isinstance(action_name, str) or not isinstance(text, str):
+            raise TypeError("action name and text should be strings")
+        action = data_struct.get_action(action_name)
+        self.runner.run_detached(
+            text, action, reply, lambda message: reply(error="apply: {}".format(message))
+        )
+
+    def query_groups(self, reply):
+        """Return the names of the text groups and the action groups with their actions"""
+        texts = [data.name for data in self.data.texts.contents]
+        actions = {data.name: list(data.by_name) for data in self.data.actions.contents}
+        reply({"texts": texts, "actions": actions})
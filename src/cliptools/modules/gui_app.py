@@ -1,16 +1,16 @@
 """ClipTools clipboard manager and text processing tools
 with a lines based GUI interface
 
-GUI App as a wx.App
+GUI App as a wx.App, it is the renderer of the engine
 """
 
 import wx
 
-from cliptools.modules import gui_frame
+from cliptools.modules import gui_frame, gui_tools
 
 
 class GuiLinesApp(wx.App):
-    """Main GUI App"""
+    """Main GUI App, provides the methods of engine.Renderer"""
 
     def OnInit(self):
         """wxPython calls OnInit to create widgets"""
@@ -19,6 +19,30 @@ class GuiLinesApp(wx.App):
         self.frame.Show(True)
         return True
 
+    def register_callbacks(self, *callbacks):
+        """Callbacks coming from engine, the frame handles the events"""
+        self.frame.register_callbacks(*callbacks)
+
+    def main_loop(self):
+        """Run the GUI main loop"""
+        self.MainLoop()
+
+    def update_data(self, *data):
+        """Push the data to the frame, see GuiLinesFrame.update_data"""
+        self.frame.update_data(*data)
+
+    def show_info(self):
+        """Display program info"""
+        gui_tools.show_info()
+
+    def show_error(self, msg):
+        """Error message to show"""
+        gui_tools.show_error(msg)
+
+    def call_after(self, func, *args):
+        """Call the function in the GUI thread, can be used from other threads"""
+        wx.CallAfter(func, *args)
+
     def minimize(self):
         """Minimize window"""
         self.frame.Iconize(True)
@@ -2,10 +2,12 @@
 with a lines based GUI interface
 
 Details panel are an addition, it will show the selected text, function help and processed text
+Huge texts are loaded partially, the rest can be loaded on request
 """
 
 import wx
 
+from cliptools import config
 from cliptools.modules import gui_show_hide_panel
 
 
@@ -14,6 +16,9 @@ class DetailsPanel(gui_show_hide_panel.ShowHidePanel):
     the selected text, function help and processed text"""
 
     def __init__(self, parent):
+        # Last data given by the update and what is loaded of them into the text controls
+        self.data = ("", "", "")
+        self.loaded = [None, None, None]  # (text, loaded length) pairs
         super().__init__(parent, wx.VERTICAL, "Z")
 
     def create_content_and_sizer(self):
@@ -37,9 +42,13 @@ class DetailsPanel(gui_show_hide_panel.ShowHidePanel):
             size=(200, 100),
             style=wx.TE_MULTILINE | wx.TE_READONLY,
         )
+        self.load_more_btn = wx.Button(self.show_hide_panel, -1, "Load more")
+        self.load_more_btn.Bind(wx.EVT_BUTTON, self.on_load_more)
+        self.load_more_btn.Hide()
         details_sizer.Add(self.selected_text, 1, wx.EXPAND)
         details_sizer.Add(self.action_doc, 1, wx.EXPAND)
         details_sizer.Add(self.processed_text, 1, wx.EXPAND)
+        details_sizer.Add(self.load_more_btn, 0, wx.EXPAND)
         return details_sizer
 
     def set_editor(self):
@@ -47,16 +56,55 @@ class DetailsPanel(gui_show_hide_panel.ShowHidePanel):
         return self.selected_text
 
     def update_data(self, selected_text, action_doc, processed_text):
-        """Update the details texts"""
-        self.selected_text.Clear()
-        self.selected_text.AppendText(selected_text)
-        self.selected_text.SetInsertionPoint(0)
-        self.action_doc.Clear()
-        self.action_doc.AppendText(action_doc)
-        self.action_doc.SetInsertionPoint(0)
-        self.processed_text.Clear()
-        self.processed_text.AppendText(processed_text)
-        self.processed_text.SetInsertionPoint(0)
+        """Update the details texts, hidden panel is updated only when it is shown"""
+        self.data = (selected_text, action_doc, processed_text)
+        if self.show_hide_panel.IsShown():
+            self.load_data()
+
+    def show_hide(self):
+        """Override: load the data when the panel is shown"""
+        super().show_hide()
+        if self.show_hide_panel.IsShown():
+            self.load_data()
+
+    def get_controls(self):
+        """Text controls in the order of the data"""
+        return (self.selected_text, self.action_doc, self.processed_text)
+
+    def load_data(self):
+        """Load the start of the changed texts into the text controls"""
+        for i, (control, text) in enumerate(zip(self.get_controls(), self.data, strict=True)):
+            if self.loaded[i] is not None and self.loaded[i][0] == text:
+                continue  # no change since the last load
+            part = text[: config.DETAILS_TEXT_LIMIT]
+            control.Clear()
+            control.AppendText(part)
+            control.SetInsertionPoint(0)
+            self.loaded[i] = (text, len(part))
+        self.update_load_more()
+
+    def on_load_more(self, event):
+        """Load the next part of the partially loaded texts"""
+        for i, control in enumerate(self.get_controls()):
+            text, length = self.loaded[i]
+            if length < len(text):
+                part = text[length : length + config.DETAILS_TEXT_LIMIT]
+                control.AppendText(part)
+                self.loaded[i] = (text, length + len(part))
+        self.update_load_more()
+
+    def is_fully_loaded(self, i):
+        """Check whether the i-th text is loaded entirely"""
+        return self.loaded[i] is None or self.loaded[i][1] == len(self.loaded[i][0])
+
+    def update_load_more(self):
+        """Show the load more button if needed
+        partially loaded selected text cannot be edited"""
+        complete = [self.is_fully_loaded(i) for i in range(len(self.loaded))]
+        self.selected_text.SetEditable(complete[0])
+        if self.load_more_btn.IsShown() == all(complete):
+            self.load_more_btn.Show(not all(complete))
+            self.show_hide_panel.Layout()
 
     def on_editor_set_focus(self, event):
         """Override: add color,
@@ -68,4 +116,9 @@ class DetailsPanel(gui_show_hide_panel.ShowHidePanel):
         """Override: add color,
         Called when user is done with the edit, i.e. pressed escape or focus lost"""
         self.editor.SetBackgroundColour(self.GetParent().normal_color)
-        super().on_editor_done(event)
+        if self.is_fully_loaded(0):
+            super().on_editor_done(event)
+        else:
+            # partially loaded text is not an edit result
+            self.GetParent().edit_mode = False
+            self.show_hide_btn.SetFocus()
@@ -8,12 +8,13 @@ import os
 
 import wx
 
+from cliptools import config
 from cliptools.modules import (
+    clip_backends,
     commands,
     gui_details_panel,
     gui_lines_panel,
     gui_shell_panel,
-    gui_tools,
 )
 
 
@@ -28,6 +29,7 @@ class GuiLinesFrame(wx.Frame):
         self.handle_focus_event = None
         self.handle_new_text = None
         self.handle_update_request = None
+        self.handle_select_event = None
 
         # Colors to use for the lines
         self.active_color = wx.SystemSettings.GetColour(wx.SYS_COLOUR_ACTIVECAPTION)
@@ -40,9 +42,10 @@ class GuiLinesFrame(wx.Frame):
         icon = wx.Icon(iconfile, wx.BITMAP_TYPE_ANY)
         self.SetIcon(icon)
 
-        # Periodic timer events
+        # Clipboard polling, timer is restarted with adaptive intervals
+        self.poller = clip_backends.ClipPoller(clip_backends.get_backend())
         self.update_timer = wx.Timer(self)
-        self.update_timer.Start(500)
+        self.update_timer.StartOnce(self.poller.interval)
         self.Bind(wx.EVT_TIMER, self.on_update_timer)
 
         # Key events are binded to the frame
@@ -58,7 +61,10 @@ class GuiLinesFrame(wx.Frame):
         sizer_v = wx.BoxSizer(wx.VERTICAL)
 
         # Create the main panel with the lines
-        self.lines_panel = gui_lines_panel.LinesPanel(self)
+        if config.VIRTUAL_LIST:
+            self.lines_panel = gui_lines_panel.VirtualLinesPanel(self)
+        else:
+            self.lines_panel = gui_lines_panel.LinesPanel(self)
         sizer_v.Add(self.lines_panel, 0, wx.EXPAND)
 
         # Create the details panel with the multi-line texts
@@ -77,18 +83,26 @@ class GuiLinesFrame(wx.Frame):
         self.Fit()
 
     def register_callbacks(
-        self, handle_keyboard_events, handle_focus_event, handle_new_text, handle_update_request
+        self,
+        handle_keyboard_events,
+        handle_focus_event,
+        handle_new_text,
+        handle_update_request,
+        handle_select_event,
     ):
         """Callbacks coming from controller to handle communication"""
         self.handle_keyboard_events = handle_keyboard_events
         self.handle_focus_event = handle_focus_event
         self.handle_new_text = handle_new_text
         self.handle_update_request = handle_update_request
+        self.handle_select_event = handle_select_event
 
     def on_update_timer(self, event):
-        """Periodic clipboard check and trigger controller checks"""
-        text = gui_tools.get_clip_content()
-        self.handle_update_request(text)
+        """Periodic clipboard check, controller is called only if it has changed"""
+        text = self.poller.poll(self.IsIconized())
+        if text is not None:
+            self.handle_update_request(text)
+        self.update_timer.StartOnce(self.poller.interval)
         event.Skip()
 
     def on_key_press(self, event):
@@ -137,10 +151,8 @@ class GuiLinesFrame(wx.Frame):
         self.handle_keyboard_events(btn_name)
         event.Skip()
 
-    def update_data(
-        self, title, data_iter, focus_number, selected_text, action_doc, processed_text, auto_proc
-    ):
-        """Update the line data from the provided generator/iterator
+    def update_data(self, title, data, selected_text, action_doc, processed_text, auto_proc):
+        """Update the lines from the data, lines panel will ask the names it shows
         Beside also update details texts and line focus"""
-        self.lines_panel.update_data(title, data_iter, focus_number, auto_proc)
+        self.lines_panel.update_data(title, data, selected_text, auto_proc)
         self.details_panel.update_data(selected_text, action_doc, processed_text)
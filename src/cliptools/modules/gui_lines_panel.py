@@ -2,6 +2,7 @@
 with a lines based GUI interface
 
 Lines panel is the main part of the gui, with the lines containing the actual texts
+Virtual lines panel is the alternative with a scrollable list
 """
 
 import wx
@@ -18,6 +19,12 @@ class LinesPanel(wx.Panel):
         # List of textboxes for easier reference
         self.texts = list()
 
+        # Last rendered state, only the changes are pushed to the widgets
+        self.title = None
+        self.auto_proc = None
+        self.labels = [None] * config.NUMBER_OF_ROWS
+        self.highlights = [None] * config.NUMBER_OF_ROWS
+
         # Use a sizer to layout the controls, stacked vertically
         # lines and the details panel are the main parts of it
         sizer = wx.BoxSizer(wx.VERTICAL)
@@ -36,7 +43,13 @@ class LinesPanel(wx.Panel):
         subsizer.Add(btn, 0, wx.CENTER)
         sizer.Add(subsizer, 0, wx.EXPAND)
 
-        # Add the lines: 1 button 1 text
+        self.create_lines(sizer)
+
+        self.SetSizer(sizer)
+        self.Fit()
+
+    def create_lines(self, sizer):
+        """Add the lines: 1 button 1 text"""
         # Use a sizer to layout the controls,
         # Name numbering starts from 1 to match key presses
         for i in range(config.NUMBER_OF_ROWS):
@@ -53,28 +66,44 @@ class LinesPanel(wx.Panel):
             # btn.Bind(wx.EVT_ENTER_WINDOW, self.on_enter)
             # text.Bind(wx.EVT_ENTER_WINDOW, self.on_enter)
 
-        self.SetSizer(sizer)
-        self.Fit()
+    def update_data(self, title, data, text, auto_proc):
+        """Update the lines from the data names and the focus, text is used by actions
+        Only the widgets with changed text or highlight are touched"""
+        self.Freeze()
+        try:
+            self.update_header(title, auto_proc)
+            # Lines show the actual texts
+            for i, name in enumerate(data.get_names(text)):
+                self.update_line(i, name, i == data.focus)
+        finally:
+            self.Thaw()
 
-    def update_data(self, title, data_iter, focus_number, auto_proc):
-        """Update the line data from the provided generator/iterator and the focus"""
+    def update_header(self, title, auto_proc):
+        """Update the buttons of the top row if changed"""
         # Title shows where are we now
-        self.title_btn.SetLabel(title)
+        if title != self.title:
+            self.title_btn.SetLabel(title)
+            self.title = title
         # Auto_proc button
-        self.auto_process_btn.SetBackgroundColour(wx.RED if auto_proc else wx.LIGHT_GREY)
-        # Lines show the actual texts
-        for i, text in enumerate(data_iter):
-            entry = self.texts[i]
+        if auto_proc != self.auto_proc:
+            self.auto_process_btn.SetBackgroundColour(wx.RED if auto_proc else wx.LIGHT_GREY)
+            self.auto_proc = auto_proc
+
+    def update_line(self, i, text, highlight):
+        """Update one line if its text or highlight has changed"""
+        entry = self.texts[i]
+        if text != self.labels[i]:
             entry.Clear()
             entry.AppendText(text)
             entry.SetInsertionPoint(0)
-            if i == focus_number:
-                entry.SetBackgroundColour(self.GetParent().active_color)
-                # exception is needed, don't take the focus from the editor
-                if not self.GetParent().edit_mode:
-                    entry.SetFocus()
-            else:
-                entry.SetBackgroundColour(self.GetParent().normal_color)
+            self.labels[i] = text
+        if highlight != self.highlights[i]:
+            color = self.GetParent().active_color if highlight else self.GetParent().normal_color
+            entry.SetBackgroundColour(color)
+            self.highlights[i] = highlight
+        # exception is needed, don't take the focus from the editor
+        if highlight and not self.GetParent().edit_mode:
+            entry.SetFocus()
 
     def on_mouse_click(self, event):
         """Mouse clicks on the text lines.
@@ -96,3 +125,84 @@ class LinesPanel(wx.Panel):
         except ValueError:
             pass  # it was not a line, but something else
         event.Skip()
+
+
+class VirtualLinesPanel(LinesPanel):
+    """Main panel with a virtual list instead of the fixed lines
+    Only the visible rows are asked from the data, long histories can be scrolled"""
+
+    def create_lines(self, sizer):
+        """Override: add the virtual list"""
+        self.lines = VirtualList(self)
+        sizer.Add(self.lines, 1, wx.EXPAND)
+        self.lines.Bind(wx.EVT_LIST_ITEM_SELECTED, self.on_item_selected)
+        self.lines.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.on_item_activated)
+
+    def update_data(self, title, data, text, auto_proc):
+        """Override: pass the data to the list, it will fetch the visible rows"""
+        self.Freeze()
+        try:
+            self.update_header(title, auto_proc)
+            self.lines.update_data(data, text)
+            # exception is needed, don't take the focus from the editor
+            if not self.GetParent().edit_mode:
+                self.lines.SetFocus()
+        finally:
+            self.Thaw()
+
+    def on_item_selected(self, event):
+        """Selection by mouse or scrolling keys, task delegated to controller"""
+        if not self.lines.updating:
+            self.GetParent().handle_select_event(event.GetIndex())
+        event.Skip()
+
+    def on_item_activated(self, event):
+        """Double click selects the item and goes forward"""
+        self.GetParent().handle_select_event(event.GetIndex())
+        self.GetParent().handle_keyboard_events("D")
+        event.Skip()
+
+
+class VirtualList(wx.ListCtrl):
+    """Virtual list control, row texts are requested on demand"""
+
+    def __init__(self, parent):
+        wx.ListCtrl.__init__(
+            self,
+            parent,
+            -1,
+            size=(225, 25 * config.NUMBER_OF_ROWS),
+            style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL | wx.LC_NO_HEADER,
+        )
+        self.InsertColumn(0, "", width=220)
+        self.data = None
+        self.text = ""
+        self.updating = False  # selection changes by update are not user events
+
+    def update_data(self, data, text):
+        """Show the data, refresh only the visible rows"""
+        self.updating = True
+        try:
+            if data is not self.data:
+                self.DeleteAllItems()
+            self.data = data
+            self.text = text
+            self.SetItemCount(len(data.contents))
+            index = data.location + data.focus
+            if index < len(data.contents):
+                self.Select(index)
+                self.Focus(index)
+                self.EnsureVisible(index)
+            top = self.GetTopItem()
+            bottom = min(top + self.GetCountPerPage(), self.GetItemCount() - 1)
+            if bottom >= top:
+                self.RefreshItems(top, bottom)
+        finally:
+            self.updating = False
+
+    def OnGetItemText(self, item, col):  # pylint: disable=unused-argument
+        """wxPython calls it for the visible rows"""
+        try:
+            return self.data.get_item_name(item, self.text)
+        except (AttributeError, IndexError):
+            return ""
@@ -5,7 +5,6 @@ Panel with a shell for more complex actions
 """
 
 import wx
-import wx.py.shell
 
 from cliptools.modules import data_struct, gui_show_hide_panel
 
@@ -23,7 +22,10 @@ class ShellPanel(gui_show_hide_panel.ShowHidePanel):
 
     def create_content_and_sizer(self):
         """Override: Add a shell
-        panels are given, only sizer is needed"""
+        panels are given, only sizer is needed
+        Shell is imported only here, when the panel is shown first"""
+        import wx.py.shell  # pylint: disable=import-outside-toplevel
+
         shared_locals = {
             "dc": data_struct.data_collections,
             "clips": data_struct.data_collections.clip,
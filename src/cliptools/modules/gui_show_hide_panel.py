@@ -3,6 +3,7 @@ with a lines based GUI interface
 
 Abstract panel with a button and a sub-panel that can be shown or hidden
 can be vertical or horizontal, need a sizer and to fit in children
+Content of the sub-panel is created only when it is shown first
 """
 
 import wx
@@ -33,15 +34,26 @@ class ShowHidePanel(wx.Panel):
         self.show_hide_btn = wx.Button(self, -1, self.closed_title, size=(15, 15), name=key_code)
         sizer.Add(self.show_hide_btn, 0, wx.EXPAND)
 
-        # Add panel for the content
+        # Add panel for the content, content is created at the first show
         self.show_hide_panel = wx.Panel(self)
-
-        sub_sizer = self.create_content_and_sizer()
-        self.show_hide_panel.SetSizer(sub_sizer)
+        self.content_created = False
+        self.editor = None
 
         sizer.Add(self.show_hide_panel, 1, wx.EXPAND)
         self.show_hide_panel.Hide()
 
+        # Set the sizer, child objects should call fit
+        self.SetSizer(sizer)
+
+    def create_content(self):
+        """Create the content of the panel if not yet done
+        Most sessions never open the panels, so creating them is delayed"""
+        if self.content_created:
+            return
+        self.content_created = True
+        sub_sizer = self.create_content_and_sizer()
+        self.show_hide_panel.SetSizer(sub_sizer)
+
         # Define editor in the children to enable focus and keyboard input for them
         self.editor = self.set_editor()  # pylint: disable=assignment-from-none
         if self.editor:
@@ -49,9 +61,6 @@ class ShowHidePanel(wx.Panel):
             self.editor.Bind(wx.EVT_KILL_FOCUS, self.on_editor_kill_focus)
             self.editor.Bind(wx.EVT_CHAR_HOOK, self.on_key_press)
 
-        # Set the sizer, child objects should call fit
-        self.SetSizer(sizer)
-
     def create_content_and_sizer(self):
         """Abstract function, children should overwrite
         Below is an example how it should look
@@ -72,6 +81,8 @@ class ShowHidePanel(wx.Panel):
     def show_hide(self):
         """Show or hide the content panel"""
         visible = not self.show_hide_panel.IsShown()
+        if visible:
+            self.create_content()
         self.show_hide_btn.SetLabel(self.open_title if visible else self.closed_title)
         self.show_hide_panel.Show(visible)
         self.GetParent().Fit()
@@ -83,6 +94,7 @@ class ShowHidePanel(wx.Panel):
 
     def focus_editor(self):
         """Set the focus on the editor"""
+        self.create_content()
         if self.editor:
             self.editor.SetFocus()
 
@@ -4,12 +4,9 @@ with a lines based GUI interface
 Tools and utilities related to the wx module
 """
 
-import pyperclip
 import wx
 import wx.adv
 
-from cliptools.config import USE_PY_PER_CLIP
-
 
 def show_info():
     """Display program info"""
@@ -41,52 +38,3 @@ def show_error(msg):
     dlg = wx.MessageDialog(None, msg, "ClipTools", wx.OK | wx.ICON_ERROR)
     dlg.ShowModal()
     dlg.Destroy()
-
-
-def get_clip_content():
-    """Checking clipboard content, return text is available"""
-    if USE_PY_PER_CLIP:
-        try:
-            return pyperclip.paste()
-        except Exception:
-            return ""
-    # Use the wx-python clipboard
-    success_text = False
-    success_file = False
-    tdo_text = wx.TextDataObject()
-    tdo_file = wx.FileDataObject()
-    try:
-        if wx.TheClipboard.Open():
-            success_text = wx.TheClipboard.GetData(tdo_text)
-            if not success_text:
-                success_file = wx.TheClipboard.GetData(tdo_file)
-            wx.TheClipboard.Close()
-        else:
-            # print("Unable to open the clipboard")
-            return ""
-    except Exception:  # pylint: disable=broad-except
-        # print("Unable to open the clipboard")
-        return ""
-    if success_text:
-        return tdo_text.GetText()
-    if success_file:
-        return "\n".join(tdo_file.GetFilenames())
-    return ""
-
-
-def set_clip_content(text):
-    """Copy a processed text to the clipboard"""
-    if USE_PY_PER_CLIP:
-        try:
-            pyperclip.copy(text)
-        except Exception:
-            show_error("Unable to open the clipboard, try again.")
-        return
-    # Use the wx-python clipboard
-    tdo = wx.TextDataObject()
-    tdo.SetText(text)
-    if wx.TheClipboard.Open():
-        wx.TheClipboard.SetData(tdo)
-        wx.TheClipboard.Close()
-    else:
-        show_error("Unable to open the clipboard, try again.")
@@ -0,0 +1,249 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Framed protocol of the inter process communication
+
+Each message has a header: magic bytes, message type and payload length,
+then the payload follows. Payload of unknown length can be streamed in chunks,
+each chunk has its own length, an empty chunk closes the payload.
+
+Queries are JSON lists: the query name and its arguments, the result in the
+response is JSON too.
+
+Only standard modules are imported, clients should start fast.
+Even json is imported only when a query is used, key commands do not need it.
+"""
+
+import struct
+
+
+MAGIC = b"CLIP"
+HEADER = struct.Struct(">4sBQ")
+CHUNK_HEADER = struct.Struct(">I")
+CHUNKED = 2**64 - 1  # length value of the streamed payloads
+
+# Message types
+KEYS = 1  # key commands, separated by zero bytes
+TEXT = 2  # text to collect, like it was copied to the clipboard
+RESPONSE = 3  # answer of the server
+ERROR = 4  # error answer of the server
+QUERY = 5  # query of a script, answered by a JSON result
+
+RECV_SIZE = 64 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """Wrong or too large message"""
+
+
+class RemoteError(Exception):
+    """Error answer of the server"""
+
+
+###########################################################
+# Sending
+###########################################################
+
+
+def pack_message(msg_type, payload=b""):
+    """Bytes of a message with a known payload"""
+    return HEADER.pack(MAGIC, msg_type, len(payload)) + payload
+
+
+def send_message(sock, msg_type, payload=b""):
+    """Send a message with a known payload"""
+    sock.sendall(pack_message(msg_type, payload))
+
+
+def send_stream(sock, msg_type, chunks):
+    """Send a message with a payload given by an iterable of bytes"""
+    sock.sendall(HEADER.pack(MAGIC, msg_type, CHUNKED))
+    for chunk in chunks:
+        if chunk:
+            sock.sendall(CHUNK_HEADER.pack(len(chunk)) + chunk)
+    sock.sendall(CHUNK_HEADER.pack(0))
+
+
+def send_keys(sock, keys):
+    """Send key commands"""
+    send_message(sock, KEYS, "\0".join(keys).encode("utf-8"))
+
+
+def send_text(sock, text):
+    """Send a text to collect"""
+    send_message(sock, TEXT, text.encode("utf-8"))
+
+
+def send_query(sock, *request):
+    """Send a query, the name and the arguments"""
+    import json  # pylint: disable=import-outside-toplevel
+
+    send_message(sock, QUERY, json.dumps(request).encode("utf-8"))
+
+
+def iter_file_chunks(stream, size=CHUNK_SIZE):
+    """Read a binary file in chunks, usable with send_stream"""
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+###########################################################
+# Receiving
+###########################################################
+
+
+def recv_upto(sock, size):
+    """Receive bytes into a preallocated buffer until the size or the end of the connection"""
+    data = bytearray(size)
+    view = memoryview(data)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], min(size - received, RECV_SIZE))
+        if not count:
+            view.release()
+            del data[received:]
+            break
+        received += count
+    return data
+
+
+def recv_exactly(sock, size):
+    """Receive the given number of bytes, the connection should not end before"""
+    data = recv_upto(sock, size)
+    if len(data) < size:
+        raise ProtocolError("Connection closed inside a message")
+    return data
+
+
+def parse_header(header):
+    """Check and split a received header, return (type, length)"""
+    if len(header) < HEADER.size or not header.startswith(MAGIC):
+        raise ProtocolError("Not a framed message")
+    _, msg_type, length = HEADER.unpack(header)
+    return msg_type, length
+
+
+def recv_payload(sock, length, max_size=None):
+    """Receive the payload of a message as a bytearray, chunked ones are joined"""
+    if length != CHUNKED:
+        if max_size is not None and length > max_size:
+            raise ProtocolError("Message too large")
+        return recv_exactly(sock, length)
+    chunks = bytearray()
+    while True:
+        (size,) = CHUNK_HEADER.unpack(recv_exactly(sock, CHUNK_HEADER.size))
+        if size == 0:
+            return chunks
+        if max_size is not None and len(chunks) + size > max_size:
+            raise ProtocolError("Message too large")
+        chunks += recv_exactly(sock, size)
+
+
+def recv_message(sock, max_size=None):
+    """Receive a message, return (type, payload) or None if the connection is closed"""
+    header = recv_upto(sock, HEADER.size)
+    if not header:
+        return None
+    msg_type, length = parse_header(header)
+    return msg_type, recv_payload(sock, length, max_size)
+
+
+def recv_result(sock, max_size=None):
+    """Receive the answer of a query, RemoteError is raised for error answers"""
+    import json  # pylint: disable=import-outside-toplevel
+
+    message = recv_message(sock, max_size)
+    if message is None:
+        raise ProtocolError("Connection closed without answer")
+    msg_type, payload = message
+    if msg_type == ERROR:
+        raise RemoteError(payload.decode("utf-8", errors="replace"))
+    if msg_type != RESPONSE:
+        raise ProtocolError("Unexpected message type")
+    return json.loads(payload)
+
+
+def decode_query(payload):
+    """Query name and arguments of a QUERY message payload"""
+    import json  # pylint: disable=import-outside-toplevel
+
+    request = json.loads(payload)
+    if not isinstance(request, list) or not request or not isinstance(request[0], str):
+        raise ProtocolError("Wrong query")
+    return request
+
+
+def decode_keys(payload):
+    """Key commands of a KEYS message payload"""
+    if not payload:
+        return []
+    return payload.decode("utf-8").split("\0")
+
+
+class MessageParser:
+    """Incremental parser for non-blocking sockets
+    Received bytes are fed in any pieces, complete messages are taken out.
+    Declared sizes are checked before the payload arrives."""
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.buffer = bytearray()
+        self.msg_type = None
+        self.length = None
+        self.payload = None  # collected chunks of a streamed payload
+
+    def feed(self, data):
+        """Add received bytes"""
+        self.buffer += data
+
+    def is_empty(self):
+        """Check whether nothing is received from the next message"""
+        return self.msg_type is None and not self.buffer
+
+    def check_size(self, size):
+        """Raise ProtocolError if the size is over the limit"""
+        if self.max_size is not None and size > self.max_size:
+            raise ProtocolError("Message too large")
+
+    def next_message(self):
+        """Return the next (type, payload) or None if it is not complete yet"""
+        while True:
+            if self.msg_type is None:
+                if len(self.buffer) < HEADER.size:
+                    return None
+                self.msg_type, self.length = parse_header(self.buffer[: HEADER.size])
+                del self.buffer[: HEADER.size]
+                if self.length == CHUNKED:
+                    self.payload = bytearray()
+                else:
+                    self.check_size(self.length)
+            if self.length != CHUNKED:
+                if len(self.buffer) < self.length:
+                    return None
+                payload = self.buffer[: self.length]
+                del self.buffer[: self.length]
+                return self.complete(payload)
+            if len(self.buffer) < CHUNK_HEADER.size:
+                return None
+            (size,) = CHUNK_HEADER.unpack_from(self.buffer)
+            if size == 0:
+                del self.buffer[: CHUNK_HEADER.size]
+                return self.complete(self.payload)
+            self.check_size(len(self.payload) + size)
+            end = CHUNK_HEADER.size + size
+            if len(self.buffer) < end:
+                return None
+            self.payload += self.buffer[CHUNK_HEADER.size : end]
+            del self.buffer[:end]
+
+    def complete(self, payload):
+        """Reset the state for the next message"""
+        message = (self.msg_type, payload)
+        self.msg_type = None
+        self.length = None
+        self.payload = None
+        return message
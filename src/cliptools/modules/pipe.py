@@ -0,0 +1,73 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Pipe mode, applying an action on the standard input without GUI
+
+Usage: cliptools apply ACTION < input > output
+ACTION is the name of the function, like accents_asciize.
+
+Input is read in chunks of config.PIPE_CHUNK_SIZE characters, and the results
+are written as they are ready, so the memory use does not depend on the input size.
+The streaming variant of the action handles the chunk boundaries, see register_function.
+"""
+
+import os
+import sys
+
+from cliptools import config
+from cliptools.modules import (
+    data_struct,
+    text_functions,  # noqa: F401 pylint: disable=unused-import
+    utils,
+)
+
+
+USAGE = "Usage: cliptools apply ACTION < input > output"
+
+
+def iter_chunks(stream, size=None):
+    """Read a text stream in chunks of the given number of characters"""
+    if size is None:
+        size = config.PIPE_CHUNK_SIZE
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def apply_stream(action, chunks):
+    """Apply the action on an iterable of text chunks, yield the results
+    Registered actions have a stream method, other functions are chunked by lines"""
+    stream = getattr(action, "stream", None)
+    if stream is not None:
+        return stream(chunks)
+    return utils.stream_action(action, chunks)
+
+
+def main(args):
+    """Run the pipe mode, return the exit code"""
+    if len(args) != 1:
+        print(USAGE, file=sys.stderr)
+        return 2
+    try:
+        action = data_struct.get_action(args[0])
+    except RuntimeError as exc:
+        print("{}\n{}".format(exc, USAGE), file=sys.stderr)
+        return 2
+    # newline="" keeps the line ends, surrogateescape keeps the invalid bytes
+    for stream in (sys.stdin, sys.stdout):
+        stream.reconfigure(encoding="utf-8", errors="surrogateescape", newline="")
+    try:
+        for result in apply_stream(action, iter_chunks(sys.stdin)):
+            sys.stdout.write(result)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # the reader has quit, like head does, that is not an error
+        # output is redirected, so the flush at exit does not fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except Exception as exc:  # pylint: disable=broad-except
+        print("ERROR: {}".format(exc), file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,76 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Cache of the action previews, i.e. action results on the selected text
+"""
+
+import sys
+from collections import OrderedDict
+
+from cliptools import config
+
+
+class PreviewCache:
+    """LRU cache of action results, size is limited in bytes
+
+    Keys are (action, text hash) pairs. Only the results of one text are kept,
+    because the selected text is the only one previewed. When a new text arrives
+    all entries are dropped.
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.size = 0
+        self.text = None
+
+    def get_max_size(self):
+        """Size limit in bytes, default is taken from the config"""
+        if self.max_size is None:
+            return config.PREVIEW_CACHE_SIZE
+        return self.max_size
+
+    def clear(self):
+        """Drop all entries"""
+        self.entries.clear()
+        self.size = 0
+        self.text = None
+
+    def check_text(self, text):
+        """Drop the entries if the text has changed
+        Same object is the usual case, comparing content is only the fallback"""
+        if text is self.text:
+            return
+        if self.text is not None and (len(text), hash(text)) == (len(self.text), hash(self.text)):
+            if text == self.text:
+                self.text = text
+                return
+        self.clear()
+        self.text = text
+
+    def get(self, action, text, default=None):
+        """Get the cached result of the action on the text"""
+        self.check_text(text)
+        key = (action, hash(text))
+        try:
+            result = self.entries[key]
+        except KeyError:
+            return default
+        self.entries.move_to_end(key)
+        return result
+
+    def put(self, action, text, result):
+        """Store the result of the action on the text, evict the least recently used"""
+        self.check_text(text)
+        key = (action, hash(text))
+        size = sys.getsizeof(result)
+        max_size = self.get_max_size()
+        if size > max_size:
+            return  # too large to cache at all
+        if key in self.entries:
+            self.size -= sys.getsizeof(self.entries.pop(key))
+        self.entries[key] = result
+        self.size += size
+        while self.size > max_size:
+            _, old = self.entries.popitem(last=False)
+            self.size -= sys.getsizeof(old)
@@ -0,0 +1,307 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Internal server functions to handle commands delegated by newer instances
+
+One thread serves all the clients by non-blocking sockets, so a slow or stuck
+client does not block the others. Each connection has a deadline and a size
+limit. Commands are put into the queue in the order the messages are completed,
+commands of a message are kept together.
+
+Queries are put into the queue with a reply function, the engine answers them
+in the GUI thread, or in a worker thread for actions. Replies are sent back
+by the server thread.
+"""
+
+import ast
+import json
+import queue
+import selectors
+import socket
+import time
+from functools import partial
+from threading import Thread
+
+from cliptools import config
+from cliptools.modules import ipc
+
+
+class Connection:
+    """State of a client connection"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.parser = ipc.MessageParser(config.SERVER_MAX_MESSAGE)
+        self.output = bytearray()
+        self.legacy = None  # format is unknown until the first bytes arrive
+        self.input_closed = False
+        self.events = selectors.EVENT_READ
+        self.pending = 0  # number of queries waiting for the reply
+        self.deadline = time.monotonic() + config.SERVER_TIMEOUT
+
+
+class Server:
+    """Serve the delegating clients by a selector loop in a background thread
+    wake_up is called after the commands are queued to process them immediately
+    """
+
+    def __init__(self, server_socket, server_queue, wake_up):
+        self.server_socket = server_socket
+        self.server_queue = server_queue
+        self.wake_up = wake_up
+        self.selector = selectors.DefaultSelector()
+        self.connections = dict()  # socket -> Connection
+        self.accepting = True
+        self.queued = False
+        self.running = True
+        self.replies = queue.Queue()  # (connection, message) pairs to send
+        # stop and reply write into the waker, so the select returns
+        self.waker, self.waker_writer = socket.socketpair()
+        self.waker.setblocking(False)
+        server_socket.setblocking(False)
+        self.selector.register(server_socket, selectors.EVENT_READ)
+        self.selector.register(self.waker, selectors.EVENT_READ)
+
+    def start(self):
+        """Start the background thread"""
+        Thread(target=self.run, daemon=True).start()
+
+    def wake(self):
+        """Make the select return, can be called from any thread"""
+        try:
+            self.waker_writer.send(b"\0")
+        except OSError:
+            pass
+
+    def stop(self):
+        """Stop the loop and close the sockets, can be called from any thread"""
+        self.running = False
+        self.wake()
+
+    def run(self):
+        """The selector loop"""
+        try:
+            while self.running:
+                for key, mask in self.selector.select(self.get_timeout()):
+                    if key.fileobj is self.server_socket:
+                        self.accept()
+                    elif key.fileobj is self.waker:
+                        self.waker.recv(ipc.RECV_SIZE)
+                        self.send_replies()
+                    else:
+                        self.serve(key.data, mask)
+                self.check_deadlines()
+                if self.queued:
+                    self.queued = False
+                    self.wake_up()
+        finally:
+            for conn in list(self.connections.values()):
+                self.close(conn)
+            self.selector.close()
+            self.server_socket.close()
+            self.waker.close()
+            self.waker_writer.close()
+
+    def get_timeout(self):
+        """Time until the nearest deadline, None if there is no client"""
+        if not self.connections:
+            return None
+        deadline = min(conn.deadline for conn in self.connections.values())
+        return max(deadline - time.monotonic(), 0)
+
+    def check_deadlines(self):
+        """Disconnect the clients that are too slow"""
+        now = time.monotonic()
+        for conn in list(self.connections.values()):
+            if conn.deadline <= now:
+                self.close(conn)
+
+    def accept(self):
+        """Accept all the waiting clients, up to the limit"""
+        while len(self.connections) < config.SERVER_MAX_CLIENTS:
+            try:
+                (client_socket, _) = self.server_socket.accept()
+            except BlockingIOError:
+                return
+            except OSError:
+                self.running = False  # server socket is closed
+                return
+            client_socket.setblocking(False)
+            conn = Connection(client_socket)
+            self.connections[client_socket] = conn
+            self.selector.register(client_socket, conn.events, conn)
+        # too many clients, the others wait in the listen backlog
+        self.selector.unregister(self.server_socket)
+        self.accepting = False
+
+    def close(self, conn):
+        """Close the connection and accept new clients if they were stopped"""
+        if conn.events:
+            self.selector.unregister(conn.sock)
+        del self.connections[conn.sock]
+        conn.sock.close()
+        if not self.accepting and self.running:
+            self.selector.register(self.server_socket, selectors.EVENT_READ)
+            self.accepting = True
+
+    def serve(self, conn, mask):
+        """Handle the events of a client connection"""
+        if mask & selectors.EVENT_READ:
+            self.read(conn)
+        if conn.output and conn.sock in self.connections:
+            self.write(conn)
+        if conn.sock in self.connections:
+            self.update_events(conn)
+
+    def update_events(self, conn):
+        """Select the events to wait for, close the finished connection"""
+        events = 0
+        if not conn.input_closed:
+            events |= selectors.EVENT_READ
+        if conn.output:
+            events |= selectors.EVENT_WRITE
+        if not events and not conn.pending:
+            self.close(conn)
+        elif not events:
+            # waiting only for replies, nothing to select
+            self.selector.unregister(conn.sock)
+            conn.events = events
+        elif not conn.events:
+            conn.events = events
+            self.selector.register(conn.sock, events, conn)
+        elif events != conn.events:
+            conn.events = events
+            self.selector.modify(conn.sock, events, conn)
+
+    def read(self, conn):
+        """Receive the available bytes and handle the completed messages"""
+        try:
+            data = conn.sock.recv(ipc.RECV_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            self.close(conn)
+            return
+        if not data:
+            conn.input_closed = True
+        conn.parser.feed(data)
+        self.handle_input(conn)
+
+    def handle_input(self, conn):
+        """Handle the received bytes, wrong requests are answered by an error"""
+        try:
+            self.process(conn)
+        except (ValueError, SyntaxError, ipc.ProtocolError) as exc:
+            print("Wrong request received through the socket: {}".format(exc))
+            if not conn.legacy:
+                self.respond(conn, ipc.ERROR, str(exc).encode("utf-8"))
+            conn.input_closed = True  # nothing more is read from this client
+            conn.parser = ipc.MessageParser()
+
+    def process(self, conn):
+        """Handle the received bytes
+        Messages after a query wait for its reply, so the answers keep the order"""
+        parser = conn.parser
+        if conn.legacy is None and (len(parser.buffer) >= len(ipc.MAGIC) or conn.input_closed):
+            conn.legacy = bool(parser.buffer) and not parser.buffer.startswith(ipc.MAGIC)
+        if conn.legacy:
+            parser.check_size(len(parser.buffer))
+            if conn.input_closed:
+                self.handle_legacy_request(conn, bytes(parser.buffer))
+            return
+        while not conn.pending:
+            message = parser.next_message()
+            if message is None:
+                break
+            conn.deadline = time.monotonic() + config.SERVER_TIMEOUT
+            self.handle_message(conn, *message)
+
+    def respond(self, conn, msg_type, payload):
+        """Queue a response to the client"""
+        conn.output += ipc.pack_message(msg_type, payload)
+
+    def write(self, conn):
+        """Send as much of the responses as possible"""
+        try:
+            sent = conn.sock.send(conn.output)
+        except BlockingIOError:
+            return
+        except OSError:
+            self.close(conn)
+            return
+        del conn.output[:sent]
+
+    def handle_message(self, conn, msg_type, payload):
+        """Handle a framed message"""
+        if msg_type == ipc.KEYS:
+            for item in ipc.decode_keys(payload):
+                self.server_queue.put(item)
+        elif msg_type == ipc.TEXT:
+            self.server_queue.put(("text", payload.decode("utf-8")))
+        elif msg_type == ipc.QUERY:
+            request = ipc.decode_query(payload)
+            conn.pending += 1
+            # action of the query has its own time limit
+            conn.deadline = time.monotonic() + config.SERVER_TIMEOUT + config.ACTION_TIMEOUT
+            self.server_queue.put(("query", request, partial(self.reply, conn)))
+            self.queued = True
+            return
+        else:
+            self.respond(conn, ipc.ERROR, b"Unknown message type")
+            return
+        self.queued = True
+        # respond OK
+        self.respond(conn, ipc.RESPONSE, config.SERVER_SUCCESS.encode("utf-8"))
+
+    def reply(self, conn, result=None, error=None):
+        """Answer a query, can be called from any thread
+        result is sent as JSON, or the error message if it is given"""
+        if error is None:
+            message = ipc.pack_message(ipc.RESPONSE, json.dumps(result).encode("utf-8"))
+        else:
+            message = ipc.pack_message(ipc.ERROR, error.encode("utf-8"))
+        self.replies.put((conn, message))
+        self.wake()
+
+    def send_replies(self):
+        """Send the replies of the queries, the clients may have been disconnected"""
+        while True:
+            try:
+                conn, message = self.replies.get_nowait()
+            except queue.Empty:
+                return
+            if self.connections.get(conn.sock) is not conn:
+                continue
+            conn.pending -= 1
+            conn.output += message
+            self.handle_input(conn)  # messages waiting for this reply
+            self.write(conn)
+            if conn.sock in self.connections:
+                self.update_events(conn)
+
+    def handle_legacy_request(self, conn, data):
+        """Handle the old format, repr of the argument list
+        Only strings are queued, tuples are reserved for the texts and queries"""
+        args = ast.literal_eval(data.decode("UTF-8"))
+        if not isinstance(args, list):
+            print("Wrong data received through the socket, dropping it.")
+            return
+        for item in args:
+            if isinstance(item, str):
+                self.server_queue.put(item)
+            else:
+                print("Wrong item received through the socket, dropping it.")
+        self.queued = True
+        # respond OK
+        conn.output += config.SERVER_SUCCESS.encode(encoding="utf-8")
+
+
+def init_server_loop(server_socket, server_queue, wake_up):
+    """Socket will listen requests from newer instances,
+    which try to delegate commands to older instance
+    wake_up is called after each request to process the queue immediately
+    Return the server, its stop method ends the loop
+    """
+    server = Server(server_socket, server_queue, wake_up)
+    server.start()
+    return server
@@ -5,11 +5,16 @@ Text processing functions used to change active text content
 
 You can add new functions as you like.
 Naming: <action_group_name>_<action_name>(text)
+Functions working character by character should be registered as prefix safe,
+their previews are computed only on the start of the text.
+Functions that need more than whole lines can give a streaming variant,
+that handles the boundaries of the chunks, see register_function.
 
 Note: using doctest to show the usage of all functions.
 """
 
 import os
+import unicodedata
 
 from cliptools.modules import sanitize
 from cliptools.modules.data_struct import register_function
@@ -19,7 +24,35 @@ TRANSLATE_TO_EN = str.maketrans("éÉáÁűŰőŐúÚöÖüÜóÓíÍ'\"+!%/=()"
 TRANSLATE_TO_HUN = str.maketrans(";:'\"\\|[{]}0)-_=+`~!@#$%^&*(", "éÉáÁűŰőŐúÚöÖüÜóÓíÍ'\"+!%/=()")
 
 
-@register_function
+def is_starter(char):
+    """Check whether the character starts a new character in the normalizations
+    Combining marks and the Hangul vowel and final jamos join the previous one"""
+    if unicodedata.combining(char):
+        return False
+    return not ("\u1160" <= char <= "\u11ff" or "\ud7b0" <= char <= "\ud7ff")
+
+
+def stream_by_starters(func, chunks):
+    """Apply the function on the chunks, a character and its combining marks
+    are kept together, the last one of each chunk is moved to the next chunk
+
+    >>> list(stream_by_starters(list, ["ab", "\u0301c"]))
+    [['a'], ['b', '\u0301'], ['c']]
+    """
+    rest = ""
+    for chunk in chunks:
+        text = rest + chunk
+        cut = len(text) - 1
+        while cut > 0 and not is_starter(text[cut]):
+            cut -= 1
+        rest = text[cut:]
+        if cut > 0:
+            yield func(text[:cut])
+    if rest:
+        yield func(rest)
+
+
+@register_function(prefix_safe=True)
 def paste_paste(text):
     """Dummy function, return the same text
 
@@ -29,7 +62,7 @@ def paste_paste(text):
     return text
 
 
-@register_function
+@register_function(prefix_safe=True)
 def case_upper(text):
     """Text in UPPERCASE
 
@@ -39,7 +72,7 @@ def case_upper(text):
     return text.upper()
 
 
-@register_function
+@register_function(prefix_safe=True)
 def case_lower(text):
     """Text in lowercase
 
@@ -49,7 +82,7 @@ def case_lower(text):
     return text.lower()
 
 
-@register_function
+@register_function(prefix_safe=True)
 def case_title(text):
     """Text in Title Case
 
@@ -59,7 +92,7 @@ def case_title(text):
     return text.title()
 
 
-@register_function
+@register_function(prefix_safe=True)
 def accents_to_hun(text):
     """Correct accents if you forgot to change to Hungarian keyboard
     Note: I use Hungarian 101 key and US keyboards in parallel. But
@@ -73,7 +106,7 @@ def accents_to_hun(text):
     return text.translate(TRANSLATE_TO_HUN)
 
 
-@register_function
+@register_function(prefix_safe=True)
 def accents_to_en(text):
     """Correct accents if you forgot to change to English keyboard
     Note: I use Hungarian 101 key and US keyboards in parallel. But
@@ -100,6 +133,16 @@ def accents_shave_marks(text):
     return sanitize.shave_marks(text)
 
 
+@accents_shave_marks.streaming
+def accents_shave_marks_stream(chunks):
+    """Streaming variant, marks at the start of a chunk are not lost
+
+    >>> "".join(accents_shave_marks_stream(["a\u0301rvi", "\u0301z"]))
+    'arviz'
+    """
+    return stream_by_starters(sanitize.shave_marks, chunks)
+
+
 @register_function
 def accents_asciize(text):
     """Remove all unicode to be plain ascii
@@ -113,7 +156,17 @@ def accents_asciize(text):
     return sanitize.asciize(text)
 
 
-@register_function
+@accents_asciize.streaming
+def accents_asciize_stream(chunks):
+    """Streaming variant, marks at the start of a chunk are not lost
+
+    >>> "".join(accents_asciize_stream(["“O\u0308t", " sze\u0301", "\u0301p”"]))
+    '"Ot szep"'
+    """
+    return stream_by_starters(sanitize.asciize, chunks)
+
+
+@register_function(prefix_safe=True)
 def accents_dewinize(text):
     """Replace Win1252 symbols with ASCII chars or sequences
     needed when copying code parts from MS Office, like Word...
@@ -125,7 +178,7 @@ def accents_dewinize(text):
     return sanitize.dewinize(text)
 
 
-@register_function
+@register_function(prefix_safe=True)
 def filename_linux(text):
     r"""Represent filenames with Linux/Unix stile forward slashes
 
@@ -135,7 +188,7 @@ def filename_linux(text):
     return text.replace("\\", "/")
 
 
-@register_function
+@register_function(prefix_safe=True)
 def filename_win(text):
     r"""Represent filenames with Linux/Unix stile forward slashes
 
@@ -145,7 +198,7 @@ def filename_win(text):
     return text.replace("/", "\\")
 
 
-@register_function
+@register_function(prefix_safe=True)
 def filename_double(text):
     r"""Represent filenames with double back slashes
 
@@ -177,3 +230,20 @@ def split_semicolon(text):
     'Jean\\nJane\\nJohn'
     """
     return text.replace("; ", "\n").replace(";", "\n")
+
+
+@split_semicolon.streaming
+def split_semicolon_stream(chunks):
+    """Streaming variant, semicolon at the end of a chunk waits for the next one
+    so "; " is not split
+
+    >>> "".join(split_semicolon_stream(["Jean;", " Jane;", "John;"]))
+    'Jean\\nJane\\nJohn\\n'
+    """
+    rest = ""
+    for chunk in chunks:
+        text = rest + chunk
+        rest = ";" if text.endswith(";") else ""
+        yield split_semicolon(text[: len(text) - len(rest)])
+    if rest:
+        yield split_semicolon(rest)
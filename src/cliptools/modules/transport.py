@@ -0,0 +1,102 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Sockets of the single instance detection and the command delegation
+
+On Linux a Unix domain socket is used in the per-user runtime directory,
+it is faster to connect than TCP and every user has an own instance.
+TCP on localhost is the fallback, when Unix sockets are not available.
+
+Only standard modules are imported, clients should start fast.
+"""
+
+import atexit
+import os
+import socket
+import stat
+
+from cliptools.modules.address import (  # noqa: F401 pylint: disable=unused-import
+    get_address,
+    get_runtime_dir,
+    use_unix,
+)
+
+
+def create_server(address=None):
+    """Create the listening server socket
+    OSError is raised if an other instance is already listening there"""
+    if address is None:
+        address = get_address()
+    if isinstance(address, str):
+        return create_unix_server(address)
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        server_socket.bind(address)
+        server_socket.listen(10)
+    except OSError:
+        server_socket.close()
+        raise
+    return server_socket
+
+
+def create_unix_server(path):
+    """Create a Unix domain server socket, socket left by a crashed instance is replaced
+    The socket file is removed at exit"""
+    server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            server_socket.bind(path)
+        except OSError:
+            if not is_stale(path):
+                raise
+            os.unlink(path)
+            server_socket.bind(path)
+        server_socket.listen(10)
+    except OSError:
+        server_socket.close()
+        raise
+    atexit.register(remove_socket, path, os.stat(path).st_ino)
+    return server_socket
+
+
+def is_stale(path):
+    """Check whether the socket file exists, but nobody is listening"""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return False
+    except OSError:
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+    return False
+
+
+def remove_socket(path, inode):
+    """Remove the socket file, if it was not replaced in the meantime"""
+    try:
+        if os.stat(path).st_ino == inode:
+            os.unlink(path)
+    except OSError:
+        pass
+
+
+def connect(address=None):
+    """Connect to the app instance"""
+    if address is None:
+        address = get_address()
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    return socket.create_connection(address)
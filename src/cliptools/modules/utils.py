@@ -4,21 +4,42 @@ with a lines based GUI interface
 Utility functions
 """
 
+import re
+
 from cliptools import config
 
 
+NON_SPACE = re.compile(r"\S")
+
+
 def limit_text(text, length=None):
     """Limit the text to display in the GUI
     result will be like: 'start of text [...]'"""
     if length is None:
         length = config.STRING_LENTH
-    text = text.strip()
-    text = text.replace("\n", " ")
-    if len(text) <= length:
-        result = text
+    # Only a window of the text is copied, huge texts are not stripped entirely
+    match = NON_SPACE.search(text)
+    if match is None:
+        return ""
+    start = match.start()
+    window = text[start : start + length + 1]
+    if len(window) > length and NON_SPACE.search(text, start + length):
+        # stripped text is longer than the limit
+        result = window[: length - 5] + "[...]"
     else:
-        result = text[: length - 5] + "[...]"
-    return result
+        result = window.rstrip()
+    return result.replace("\n", " ")
+
+
+def text_prefix(text, length=None):
+    """Start of the text that is enough to display it with limit_text
+    Leading whitespace is skipped by a regex search, the text is not copied"""
+    if length is None:
+        length = config.STRING_LENTH
+    match = NON_SPACE.search(text)
+    start = match.start() if match else len(text)
+    # double length gives room for actions that shorten the text
+    return text[: start + 2 * length]
 
 
 def safe_action(text, action):
@@ -28,3 +49,38 @@ def safe_action(text, action):
     except Exception as exc:  # pylint: disable=broad-except
         result = "ERROR: {}".format(exc)
     return result
+
+
+def find_cut(text, prefix_safe=False, limit=None):
+    """Position where the text can be cut for an action, 0 if nowhere
+    Prefix safe actions can be cut anywhere, if the text is over the limit"""
+    if limit is None:
+        limit = config.PIPE_CHUNK_SIZE
+    cut = text.rfind("\n") + 1
+    if cut or not prefix_safe:
+        return cut
+    cut = max(text.rfind(" "), text.rfind("\t")) + 1
+    if cut or len(text) < limit:
+        return cut
+    return len(text)
+
+
+def stream_action(action, chunks):
+    """Apply the action on an iterable of text chunks, yield the results
+    Chunks are cut at line ends, so the action sees whole lines. Prefix safe actions
+    work character by character, they are cut at the last space too, or anywhere
+    in very long words. Other actions need at least a whole line in the memory."""
+    prefix_safe = getattr(action, "prefix_safe", False)
+    pending = []
+    for chunk in chunks:
+        pending.append(chunk)
+        if "\n" not in chunk and not prefix_safe:
+            continue  # line is not finished yet
+        text = "".join(pending)
+        cut = find_cut(text, prefix_safe)
+        pending = [text[cut:]] if cut < len(text) else []
+        if cut:
+            yield action(text[:cut])
+    text = "".join(pending)
+    if text:
+        yield action(text)
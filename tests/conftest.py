@@ -9,6 +9,26 @@ import pytest
 from cliptools import config
 
 
+def pytest_addoption(parser):
+    """Timing tests depend on the machine, they run only on request"""
+    parser.addoption("--benchmark", action="store_true", help="run the benchmark tests too")
+
+
+def pytest_configure(config):  # pylint: disable=redefined-outer-name
+    """Register the markers"""
+    config.addinivalue_line("markers", "benchmark: timing test, run by --benchmark")
+
+
+def pytest_collection_modifyitems(config, items):  # pylint: disable=redefined-outer-name
+    """Skip the benchmarks unless they are requested"""
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmark, use --benchmark to run it")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture
 def testconfig():
     """Change configuration values for easier test writing"""
@@ -0,0 +1,214 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Test
+
+Background execution of the actions
+"""
+
+# pragma pylint: disable=missing-docstring,unused-argument
+
+import queue
+import threading
+import time
+
+import pytest
+
+from cliptools.modules import action_runner, data_struct
+
+
+@pytest.fixture
+def runner():
+    """Runner delivering the results into a queue, test thread plays the GUI thread
+    Single worker, so the actions are executed in order"""
+    calls = queue.Queue()
+    sut = action_runner.ActionRunner(lambda func, *args: calls.put((func, args)), max_workers=1)
+    sut.calls = calls
+    yield sut
+    sut.shutdown()
+
+
+def process_one(sut):
+    func, args = sut.calls.get(timeout=5)
+    func(*args)
+
+
+def test_runner_result(runner):
+    results = []
+    runner.submit("key", "foo", str.upper, results.append)
+    assert runner.is_running("key")
+    process_one(runner)
+    assert results == ["FOO"]
+    assert not runner.is_running("key")
+
+
+def test_runner_error(runner):
+    results = []
+    runner.submit("key", "foo", int, results.append)
+    process_one(runner)
+    assert results[0].startswith("ERROR: ")
+
+
+def test_runner_cancel(runner):
+    results = []
+    runner.submit("key", "foo", str.upper, results.append)
+    runner.cancel_all()
+    runner.submit("other", "bar", str.upper, results.append)
+    while runner.is_running("other"):
+        process_one(runner)
+    assert results == ["BAR"]
+
+
+def test_runner_timeout(runner):
+    release = threading.Event()
+
+    def slow(text):
+        release.wait(5)
+        return text
+
+    slow.timeout = 0.05
+    results = []
+    runner.submit("key", "foo", slow, results.append)
+    process_one(runner)  # the watchdog
+    while runner.is_running("key"):
+        process_one(runner)
+    release.set()
+    assert results == ["ERROR: timeout after 0.05 s"]
+
+
+def test_runner_waiting_is_not_limited(runner):
+    def slow(text):
+        time.sleep(0.1)
+        return text
+
+    slow.timeout = 0.15  # only the own run is limited, not the waiting
+    results = []
+    for key in range(3):
+        runner.submit(key, str(key), slow, results.append)
+    while runner.jobs:
+        process_one(runner)
+    assert results == ["0", "1", "2"]
+
+
+def test_runner_replaces_hung_workers(runner):
+    release = threading.Event()
+
+    def hung(text):
+        release.wait(5)
+        return text
+
+    hung.timeout = 0.05
+    results = []
+    try:
+        for i in range(3):  # more than the workers
+            runner.submit(i, "foo", hung, results.append)
+        runner.submit("last", "bar", str.upper, results.append)
+        while runner.jobs:
+            process_one(runner)
+        assert results[:3] == ["ERROR: timeout after 0.05 s"] * 3
+        assert results[3:] == ["BAR"]
+    finally:
+        release.set()
+
+
+def test_runner_many_jobs_one_watchdog(runner):
+    results = []
+    runner.submit(0, "foo", str.upper, results.append)
+    watchdog = runner.timer
+    for key in range(1, 1000):
+        runner.submit(key, "foo", str.upper, results.append)
+    assert runner.timer is watchdog
+    runner.cancel_all()
+
+
+def test_runner_detached(runner):
+    release = threading.Event()
+
+    def slow(text):
+        release.wait(5)
+        return text
+
+    slow.timeout = 0.05
+    results = []
+    runner.run_detached("foo", str.upper, results.append)
+    runner.cancel_all()
+    process_one(runner)
+    assert results == ["FOO"]
+    try:
+        runner.run_detached("foo", slow, results.append)
+        while runner.jobs:
+            process_one(runner)
+        assert results[1:] == ["ERROR: timeout after 0.05 s"]
+    finally:
+        release.set()
+
+
+def test_preview_timeout_not_cached(testconfig, runner):
+    release = threading.Event()
+
+    def slow(text):
+        release.wait(5)
+        return text
+
+    slow.timeout = 0.05
+    data_struct.preview_runner = runner
+    try:
+        text = "Timeout"
+        assert data_struct.get_preview(slow, text) == action_runner.COMPUTING
+        while runner.jobs:
+            process_one(runner)
+        assert data_struct.get_preview(slow, text) == "ERROR: timeout after 0.05 s"
+        assert data_struct.action_previews.get(slow, text) is None
+        release.set()
+        data_struct.precompute_previews("other", data_struct.DataCollection("SUT"))
+        assert data_struct.get_preview(slow, text) == action_runner.COMPUTING  # retried
+        while runner.jobs:
+            process_one(runner)
+        assert data_struct.get_preview(slow, text) == text
+    finally:
+        release.set()
+        data_struct.preview_runner = None
+
+
+def test_get_preview_background(testconfig, runner):
+    data_struct.preview_runner = runner
+    try:
+        sut = data_struct.ActionData("SUT")
+        sut.add_content(("0", str.swapcase))
+        text = "Background"
+        assert sut.get_name(0, text) == "0: " + action_runner.COMPUTING
+        process_one(runner)
+        assert sut.get_name(0, text) == "0: bACKGROUND"
+    finally:
+        data_struct.preview_runner = None
+
+
+def test_precompute_previews(testconfig, runner):
+    data_struct.preview_runner = runner
+    try:
+        order = []
+
+        def make_action(name):
+            def action(text):
+                order.append(name)
+                return name
+
+            return action
+
+        actions = data_struct.DataCollection("SUT")
+        for group_name in "ab":
+            group = data_struct.ActionData(group_name)
+            for i in range(7):
+                group.add_content((str(i), make_action(group_name + str(i))))
+            actions.add_content(group)
+        actions.get_content_by_name("b").page_down()
+        text = "Precompute"
+        data_struct.precompute_previews(text, actions)
+        while runner.jobs:
+            process_one(runner)
+        assert order[:7] == ["a0", "a1", "a2", "a3", "a4", "b5", "b6"]
+        assert sorted(order) == sorted(a + str(i) for a in "ab" for i in range(7))
+        group = actions.get_content_by_name("a")
+        assert group.get_name(0, text) == "0: a0"
+    finally:
+        data_struct.preview_runner = None
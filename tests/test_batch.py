@@ -0,0 +1,100 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Test
+
+Batch mode, applying an action on the files of a directory tree
+"""
+
+# pragma pylint: disable=missing-docstring,unused-argument,redefined-outer-name
+
+import pathlib
+
+import pytest
+
+from cliptools.modules import batch
+
+
+TEXT = "“Word • export™”\r\nsecond line\n"
+RESULT = '"Word - export(TM)"\r\nsecond line\n'
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "root"
+    (root / "sub").mkdir(parents=True)
+    for name in ["a.txt", "sub/b.txt", "sub/c.dat"]:
+        (root / name).write_text(TEXT, encoding="utf-8", newline="")
+    return root
+
+
+def read(path):
+    return path.read_bytes().decode("utf-8")
+
+
+def test_find_files(tree):
+    assert batch.find_files(tree, "*.txt") == [tree / "a.txt", tree / "sub" / "b.txt"]
+    assert batch.find_files(tree, "*", exclude=tree / "sub") == [tree / "a.txt"]
+
+
+def test_find_files_exclude_spelling(tree, monkeypatch):
+    monkeypatch.chdir(tree)
+    assert batch.find_files(tree, "*", exclude=pathlib.Path("sub")) == [tree / "a.txt"]
+    assert batch.find_files(pathlib.Path("."), "*", exclude=tree / "sub") == [
+        pathlib.Path("a.txt")
+    ]
+    assert batch.find_files(tree, "*", exclude=tree / "sub" / ".." / "sub") == [tree / "a.txt"]
+
+
+def test_process_file(tree, tmp_path):
+    size, seconds = batch.process_file(
+        "accents_dewinize", tree / "a.txt", tmp_path / "x" / "a.txt"
+    )
+    assert size == len(TEXT.encode("utf-8"))
+    assert seconds >= 0
+    assert read(tmp_path / "x" / "a.txt") == RESULT
+
+
+def test_batch_in_place(tree, capsys):
+    assert batch.main(["accents_dewinize", str(tree), "--workers", "2"]) == 0
+    assert read(tree / "a.txt") == RESULT
+    assert read(tree / "sub" / "b.txt") == RESULT
+    assert read(tree / "sub" / "c.dat") == TEXT
+    assert list(tree.rglob("*" + batch.TEMP_SUFFIX)) == []
+    output = capsys.readouterr().out
+    assert "MB/s" in output
+    assert "Processed 2 files" in output
+
+
+def test_batch_output_dir(tree, tmp_path, capsys):
+    out = tmp_path / "out"
+    assert batch.run("filename_linux", tree, out, pattern="*", workers=2) == 0
+    assert read(out / "sub" / "c.dat") == TEXT
+    assert read(tree / "a.txt") == TEXT
+    lines = capsys.readouterr().out.splitlines()
+    assert sum("MB/s" in line for line in lines) == 4  # 3 files and the total
+    assert "Processed 3 files" in lines[-1]
+
+
+def test_batch_output_inside_the_tree(tree, capsys):
+    out = tree / "out"
+    assert batch.run("case_upper", tree, out, workers=1) == 0
+    assert batch.run("case_upper", tree, out, workers=1) == 0  # results are not processed again
+    assert sorted(path.name for path in out.rglob("*")) == ["a.txt", "b.txt", "sub"]
+    output = capsys.readouterr().out
+    assert output.count("Processed 2 files") == 2
+    assert str(out) + "/" not in output  # no result file was reported as a source
+
+
+def test_batch_error(tree, tmp_path, capsys):
+    blocker = tmp_path / "blocker"
+    blocker.write_text("not a directory", encoding="utf-8")
+    assert batch.run("case_upper", tree, blocker / "out", workers=1) == 2
+    output = capsys.readouterr()
+    assert output.err.count("ERROR") == 2
+    assert "Processed 0 files" in output.out
+
+
+def test_batch_unknown_action(tree):
+    with pytest.raises(SystemExit):
+        batch.main(["nothing", str(tree)])
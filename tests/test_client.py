@@ -0,0 +1,152 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Test
+
+Fast client for the hotkeys
+"""
+
+# pragma pylint: disable=missing-docstring,unused-argument,redefined-outer-name
+
+import os
+import queue
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from cliptools import client, config
+from cliptools import main as app
+from cliptools.modules import address, server, transport
+
+
+# Modules the client may import on top of the interpreter startup
+ALLOWED_IMPORTS = {
+    "_socket",
+    "_struct",
+    "struct",
+    "cliptools",
+    "cliptools.config",
+    "cliptools.modules",
+    "cliptools.modules.address",
+    "cliptools.modules.ipc",
+    "cliptools.client",
+}
+
+# Slow modules of the full app, the client must not import them
+FORBIDDEN_IMPORTS = ["wx", "ast", "concurrent", "socket", "selectors", "json", "enum"]
+
+
+def import_times(code):
+    """Run python -X importtime, return module -> cumulative microseconds"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = dict()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdecimal():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.fixture
+def runtime_dir(tmp_path, monkeypatch):
+    os.chmod(tmp_path, 0o700)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "TRANSPORT", "unix")
+    # nothing should answer on TCP
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        monkeypatch.setattr(config, "PORT", sock.getsockname()[1])
+    return tmp_path
+
+
+def test_allowed_imports():
+    baseline = import_times("pass")
+    times = import_times("import cliptools.client")
+    imported = set(times) - set(baseline)
+    assert imported <= ALLOWED_IMPORTS
+
+
+def loaded_modules(code):
+    """Run the code, return the names in sys.modules after it"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    result = subprocess.run(
+        [sys.executable, "-c", code + "; import sys; print(' '.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_no_slow_imports():
+    imported = loaded_modules("import cliptools.client") - loaded_modules("pass")
+    assert "cliptools.client" in imported
+    assert not {name.partition(".")[0] for name in imported} & set(FORBIDDEN_IMPORTS)
+
+
+@pytest.mark.usefixtures("runtime_dir")
+def test_same_address_as_server():
+    assert address.get_address(create=False) == transport.get_address()
+
+
+def test_no_runtime_dir_created(monkeypatch, tmp_path):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(config, "TRANSPORT", "unix")
+    monkeypatch.setattr(address.os, "getuid", lambda: "test-{}".format(tmp_path.name))
+    path = address.get_address(create=False)
+    assert isinstance(path, str)
+    assert not os.path.exists(os.path.dirname(path))
+
+
+@pytest.mark.usefixtures("runtime_dir")
+def test_no_tcp_fallback():
+    # something else listens on the TCP port, the server would not use it
+    with socket.socket() as other:
+        other.bind(("localhost", 0))
+        other.listen(1)
+        config.PORT = other.getsockname()[1]
+        assert client.delegate(["1"]) is None
+
+
+@pytest.mark.usefixtures("runtime_dir")
+def test_no_instance():
+    assert client.delegate(["1"]) is None
+
+
+@pytest.mark.usefixtures("runtime_dir")
+def test_delegate():
+    server_queue = queue.Queue()
+    listener = server.init_server_loop(transport.create_server(), server_queue, lambda: None)
+    try:
+        assert client.delegate(["1", "2"]) is True
+        assert [server_queue.get(timeout=2), server_queue.get(timeout=2)] == ["1", "2"]
+    finally:
+        listener.stop()
+
+
+@pytest.mark.parametrize("args", [["apply", "case_upper"], ["batch", "case_upper", "dir"]])
+@pytest.mark.usefixtures("runtime_dir")
+def test_modes_not_delegated(args, monkeypatch):
+    server_queue = queue.Queue()
+    listener = server.init_server_loop(transport.create_server(), server_queue, lambda: None)
+    started = []
+    monkeypatch.setattr(app, "main", lambda: started.append(sys.argv[1:]))
+    monkeypatch.setattr(sys, "argv", ["cliptools-client", *args])
+    try:
+        client.main()
+        assert started == [args]
+        assert server_queue.empty()
+    finally:
+        listener.stop()
@@ -0,0 +1,177 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Test
+
+Clipboard backends
+"""
+
+# pragma pylint: disable=missing-docstring,unused-argument
+
+import io
+import sys
+import time
+
+import pytest
+
+from cliptools.modules import clip_backends
+
+
+HELPER = """
+import sys, time
+from cliptools.modules import clip_backends
+for text in ["first", "második"]:
+    clip_backends.write_frame(sys.stdout.buffer, text)
+time.sleep(0.2)
+"""
+
+
+def test_frame_round_trip():
+    stream = io.BytesIO()
+    clip_backends.write_frame(stream, "árvíztűrő")
+    clip_backends.write_frame(stream, "")
+    stream.seek(0)
+    assert clip_backends.read_frame(stream) == "árvíztűrő"
+    assert clip_backends.read_frame(stream) == ""
+    assert clip_backends.read_frame(stream) is None
+
+
+def test_frame_truncated():
+    stream = io.BytesIO()
+    clip_backends.write_frame(stream, "text")
+    stream = io.BytesIO(stream.getvalue()[:-1])
+    assert clip_backends.read_frame(stream) is None
+
+
+def test_iter_terminated(monkeypatch):
+    monkeypatch.setattr(clip_backends, "READ_SIZE", 3)  # texts cut into chunks
+    stream = io.BytesIO("első\0\0harmadik\0cut".encode("utf-8"))
+    assert list(clip_backends.iter_terminated(stream)) == ["első", "", "harmadik"]
+
+
+def test_watch_backend_terminated():
+    command = ["sh", "-c", "printf 'first\\0'; printf 'második\\0'; sleep 0.2"]
+    sut = clip_backends.WatchBackend(
+        command, clip_backends.FakeBackend(), clip_backends.iter_terminated
+    )
+    try:
+        sut.reader.join(10)
+        assert sut.take_changes() == ["first", "második"]
+    finally:
+        sut.close()
+
+
+def test_stamped_reader():
+    clipboard = {"stamp": 1, "text": "first"}
+    reads = []
+
+    def read_text():
+        reads.append(clipboard["text"])
+        return clipboard["text"]
+
+    sut = clip_backends.StampedReader(lambda: clipboard["stamp"], read_text)
+    assert sut.check() == "first"
+    assert sut.check() is None  # same stamp, the text is not read
+    clipboard.update(stamp=2, text="second")
+    assert sut.check() == "second"
+    clipboard["stamp"] = 3  # new owner, same text
+    assert sut.check() is None
+    assert reads == ["first", "second", "second"]
+    clipboard.update(stamp=None, text="no stamp")  # read at each check
+    assert sut.check() == "no stamp"
+    assert sut.check() is None
+    assert len(reads) == 5
+
+
+def test_fake_backend():
+    sut = clip_backends.create_backend("fake")
+    assert sut.paste() == ""
+    sut.copy("foo")
+    assert sut.paste() == "foo"
+    assert sut.sequence == 1
+
+
+def test_unknown_backend():
+    with pytest.raises(RuntimeError):
+        clip_backends.create_backend("unknown")
+
+
+def test_watch_backend():
+    fallback = clip_backends.FakeBackend("fallback")
+    sut = clip_backends.WatchBackend([sys.executable, "-c", HELPER], fallback)
+    try:
+        deadline = time.monotonic() + 10
+        while sut.changes < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert sut.paste() == "második"
+        assert sut.take_changes() == ["first", "második"]
+        sut.copy("copied")  # copy is done by the fallback
+        assert fallback.paste() == "copied"
+        sut.reader.join(10)
+        assert sut.paste() == "copied"  # helper exited, fallback is used
+        assert sut.sequence is None
+    finally:
+        sut.close()
+
+
+class NoSequenceBackend(clip_backends.ClipBackend):
+    def __init__(self, text):
+        self.text = text
+
+    def paste(self):
+        return self.text
+
+
+def test_poller_sequence():
+    backend = clip_backends.FakeBackend("start")
+    sut = clip_backends.ClipPoller(backend)
+    assert sut.poll() == "start"
+    backend.text = "not reported"  # sequence not changed, not read
+    assert sut.poll() is None
+    backend.copy("new")
+    assert sut.poll() == "new"
+    backend.copy("new")  # same text again
+    assert sut.poll() is None
+
+
+def test_poller_no_sequence():
+    backend = NoSequenceBackend("start")
+    sut = clip_backends.ClipPoller(backend)
+    assert sut.poll() == "start"
+    assert sut.poll() is None
+    backend.text = "new"
+    assert sut.poll() == "new"
+
+
+@pytest.mark.usefixtures("testconfig")
+def test_poller_interval():
+    backend = clip_backends.FakeBackend("start")
+    sut = clip_backends.ClipPoller(backend)
+    sut.poll()
+    assert sut.interval == clip_backends.config.CLIP_POLL_MIN
+    for _ in range(20):
+        sut.poll()
+    assert sut.interval == clip_backends.config.CLIP_POLL_MAX
+    for _ in range(20):
+        sut.poll(minimized=True)
+    assert sut.interval == clip_backends.config.CLIP_POLL_MINIMIZED
+    backend.copy("new")
+    sut.poll(minimized=True)
+    assert sut.interval == clip_backends.config.CLIP_POLL_MIN
+
+
+def test_poller_queued_changes():
+    backend = clip_backends.FakeBackend("start")
+    sut = clip_backends.ClipPoller(backend)
+    assert sut.poll() == "start"
+    for text in ["first", "second", "second", "third"]:
+        backend.copy(text)  # all between two polls
+    assert [sut.poll() for _ in range(4)] == ["first", "second", "third", None]
+
+
+@pytest.mark.usefixtures("testconfig")
+def test_poller_unqueued_interval():
+    sut = clip_backends.ClipPoller(NoSequenceBackend("start"))
+    for _ in range(20):
+        sut.poll(minimized=True)
+    assert sut.interval == clip_backends.config.CLIP_POLL_UNQUEUED
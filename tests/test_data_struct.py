@@ -281,6 +281,26 @@ def test_base_focus_with_add_begin_page_down_full(testconfig):
     assert sut.get_focused_content() == "9"
 
 
+@pytest.mark.usefixtures("testconfig")
+def test_base_get_item_name():
+    sut = data_struct.BaseData("SUT", text_range(10))
+    assert sut.get_item_name(7) == "7"
+    with pytest.raises(IndexError):
+        sut.get_item_name(10)
+
+
+@pytest.mark.usefixtures("testconfig")
+def test_base_set_focus_index():
+    sut = data_struct.BaseData("SUT", text_range(12))
+    sut.set_focus_index(3)
+    assert (sut.location, sut.focus) == (0, 3)
+    sut.set_focus_index(11)
+    assert (sut.location, sut.focus) == (10, 1)
+    assert sut.get_focused_content() == "11"
+    sut.set_focus_index(12)  # out of range, no change
+    assert sut.get_focused_content() == "11"
+
+
 def test_is_first_selected_1(testconfig):
     sut = data_struct.BaseData("SUT", text_range(10))
     assert sut.is_first_selected()
@@ -310,6 +330,104 @@ def test_text_add_content(testconfig):
     assert sut.get_content(1) == "0"
 
 
+def test_text_add_content_ring(testconfig):
+    sut = data_struct.TextData("SUT", text_range(20))
+    for i in range(100):
+        sut.add_content(str(-i - 1))
+    assert len(sut.contents) == 20
+    assert sut.get_content(0) == "-100"
+    assert sut.contents[-1] == "-81"
+
+
+###########################################################
+# Test the class ClipData
+###########################################################
+
+
+def test_clip_add_content(testconfig):
+    sut = data_struct.ClipData("SUT", ["0", "1"])
+    sut.add_content("-1")
+    assert sut.get_content(0) == "-1"
+    assert sut.get_content(1) == "0"
+    assert list(sut.contents) == ["-1", "0", "1"]
+
+
+def test_clip_add_duplicate(testconfig):
+    sut = data_struct.ClipData("SUT", text_range(4))
+    sut.add_content("2")
+    sut.add_content("2")
+    assert list(sut.contents) == ["2", "0", "1", "3"]
+
+
+def test_clip_add_duplicate_focus(testconfig):
+    sut = data_struct.ClipData("SUT", text_range(4))
+    sut.set_focus(1)
+    sut.add_content("3")  # focus moves with item
+    assert sut.get_focused_content() == "1"
+    sut.add_content("1")  # focused item moved to the start
+    assert sut.get_focused_content() == "1"
+    assert sut.focus == 0
+
+
+def test_clip_add_duplicate_after_page(testconfig):
+    sut = data_struct.ClipData("SUT", text_range(15))
+    sut.page_down()
+    sut.add_content("12")  # like a new item, page is kept
+    assert sut.get_content(0) == "5"
+    sut.add_content("1")  # before the page, page is kept
+    assert sut.get_content(0) == "5"
+    assert sut.contents[0] == "1"
+
+
+def test_clip_add_duplicate_on_later_page(testconfig):
+    sut = data_struct.ClipData("SUT", text_range(15))
+    sut.page_down()
+    sut.set_focus(1)
+    assert list(sut.get_names()) == ["5", "6", "7", "8", "9"]
+    sut.add_content("8")  # clips before it move down, page follows them
+    assert list(sut.get_names()) == ["5", "6", "7", "9", "10"]
+    assert sut.get_focused_content() == "6"
+    sut.set_focus(4)
+    sut.add_content("7")  # clips after it move up, so does the focus
+    assert sut.get_focused_content() == "10"
+    sut.add_content("10")  # focused clip moves to the start, focus follows
+    assert sut.get_focused_content() == "10"
+    assert sut.location == 0
+
+
+def test_clip_full(testconfig):
+    sut = data_struct.ClipData("SUT", text_range(20))
+    sut.add_content("-1")
+    assert len(sut.contents) == 20
+    assert sut.contents[-1] == "18"
+    assert "19" not in sut.contents
+
+
+def test_clip_store_init_duplicates(testconfig):
+    sut = data_struct.ClipStore(["0", "1", "0", "2"])
+    assert list(sut) == ["0", "1", "2"]
+    assert sut[-1] == "2"
+    assert sut[1:] == ["1", "2"]
+    with pytest.raises(IndexError):
+        sut[3]
+
+
+def test_clip_store_shell_changes(testconfig):
+    sut = data_struct.ClipStore(["0", "1"])
+    sut.append("2")
+    sut.append("0")  # the shell may add duplicates
+    sut.remove("0")
+    assert list(sut) == ["1", "2", "0"]
+    assert "0" in sut
+    sut[2] = "3"
+    del sut[0]
+    assert list(sut) == ["2", "3"]
+    assert "0" not in sut
+    assert "1" not in sut
+    sut.appendleft("3")
+    assert list(sut) == ["3", "2"]
+
+
 ###########################################################
 # Test the class ActionData
 ###########################################################
@@ -328,6 +446,15 @@ def test_action_add_duplicate_content(testconfig):
         sut.add_content(("0", str.lower))
 
 
+def test_action_add_content_evicted(testconfig):
+    sut = data_struct.ActionData("SUT")
+    for i in range(21):
+        sut.add_content((str(i), str.lower))
+    assert "0" not in sut.by_name
+    sut.add_content(("0", str.upper))  # evicted name can be added again
+    assert sut.by_name["0"] == str.upper
+
+
 def test_action_get_name(testconfig):
     sut = data_struct.ActionData("SUT")
     sut.add_content(("0", str.lower))
@@ -347,6 +474,20 @@ def test_action_get_names(testconfig):
     assert list(sut.get_names("FOo")) == ["0: foo", "1: FOO", "", "", ""]
 
 
+def test_action_get_name_prefix_safe(testconfig):
+    lengths = []
+
+    def action(text):
+        lengths.append(len(text))
+        return text.upper()
+
+    action.prefix_safe = True
+    sut = data_struct.ActionData("SUT")
+    sut.add_content(("0", action))
+    assert sut.get_name(0, "  " + "fo" * 1000) == "0: FOFOF[...]"
+    assert lengths == [22]
+
+
 ###########################################################
 # Test the class DataCollection
 ###########################################################
@@ -371,6 +512,15 @@ def test_collection_get_content_by_name(testconfig):
         sut.get_content_by_name("two")
 
 
+def test_collection_get_content_by_name_evicted(testconfig):
+    sut = data_struct.DataCollection("SUT", [data_struct.TextData(str(i)) for i in range(20)])
+    assert sut.get_content_by_name("0").name == "0"
+    sut.add_content(data_struct.TextData("20"))
+    assert sut.get_content_by_name("20").name == "20"
+    with pytest.raises(RuntimeError):
+        sut.get_content_by_name("0")
+
+
 ###########################################################
 # Test the class DataCollections (the "only" one)
 ###########################################################
@@ -402,3 +552,39 @@ def test_register_function(testconfig):
         data_struct.register_function(groupname_funcname)
     actions = data_struct.data_collections.actions.get_content_by_name("groupname")
     assert actions.get_name(0, "T") == "funcname: T"
+    assert not actions.get_content(0).prefix_safe
+
+
+def test_register_function_prefix_safe(testconfig):
+    # Note: this test has side effect, see above
+    @data_struct.register_function(prefix_safe=True)
+    def groupname_prefixsafe(txt):
+        return txt
+
+    assert groupname_prefixsafe.prefix_safe
+    assert groupname_prefixsafe("T") == "T"
+
+
+@pytest.mark.usefixtures("testconfig")
+def test_register_function_stream():
+    # Note: this test has side effect, see above
+    @data_struct.register_function
+    def groupname_streamdefault(txt):
+        return "<{}>".format(txt)
+
+    assert list(groupname_streamdefault.stream(["a\nb", "c\n", "d"])) == [
+        "<a\n>",
+        "<bc\n>",
+        "<d>",
+    ]
+
+    @data_struct.register_function
+    def groupname_streamown(txt):
+        return txt
+
+    @groupname_streamown.streaming
+    def groupname_streamown_stream(chunks):
+        return (chunk.upper() for chunk in chunks)
+
+    assert groupname_streamown.stream is groupname_streamown_stream
+    assert list(data_struct.get_action("groupname_streamown").stream(["a", "b"])) == ["A", "B"]
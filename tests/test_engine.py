@@ -0,0 +1,217 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Test
+
+Engine part, the states of the app driving the Data without any GUI
+"""
+
+# pragma pylint: disable=missing-docstring,unused-argument,redefined-outer-name
+
+import queue
+import threading
+import time
+
+import pytest
+
+from cliptools.modules import clip_backends, engine, ipc, transport
+
+
+ROUND_TRIPS = 200
+
+
+class RecordingRenderer(engine.Renderer):
+    def __init__(self):
+        super().__init__()
+        self.updates = []
+        self.minimized = 0
+
+    def update_data(self, *data):
+        self.updates.append(data)
+
+    def minimize(self):
+        self.minimized += 1
+
+
+@pytest.fixture
+def clipboard():
+    backend = clip_backends.FakeBackend()
+    clip_backends.set_backend(backend)
+    yield backend
+    clip_backends.set_backend(None)
+
+
+@pytest.fixture
+def sut(testconfig, clipboard):  # noqa: ARG001 fixtures cannot have usefixtures
+    eng = engine.Engine(RecordingRenderer())
+    yield eng
+    eng.close()
+
+
+def test_engine_start_state(sut):
+    assert sut.step == engine.TEXTS
+    assert sut.actual is sut.data.texts
+
+
+def test_engine_clip_and_navigation(sut):
+    sut.handle_update_request("foo bar")
+    assert sut.data.clip.contents[0] == "foo bar"
+    sut.handle_keyboard_events("1")  # clips
+    assert sut.step == engine.TEXT
+    assert sut.selected_text == "foo bar"
+    sut.handle_keyboard_events("1")  # select the text
+    assert sut.step == engine.ACTIONS
+    sut.handle_keyboard_events("A")  # back
+    assert sut.step == engine.TEXT
+
+
+def wait_for(sut, condition):
+    """Run the main loop calls until the condition is true"""
+    deadline = time.monotonic() + 2
+    while not condition() and time.monotonic() < deadline:
+        if not sut.renderer.process_pending():
+            time.sleep(0.001)
+    return condition()
+
+
+def test_engine_process_and_copy(sut, clipboard):
+    sut.handle_update_request("foo bar")
+    case = sut.data.actions.get_content_by_name("case")
+    group = list(sut.data.actions.contents).index(case) + 1
+    for key in ["1", "1", str(group), "1"]:  # clips, text, case group, upper
+        sut.handle_keyboard_events(key)
+    assert wait_for(sut, lambda: sut.renderer.minimized)
+    assert sut.text_to_clipboard == "FOO BAR"
+    assert clipboard.paste() == "FOO BAR"
+    assert sut.renderer.minimized == 1
+    sut.handle_update_request(clipboard.paste())  # own copy is not collected
+    assert sut.data.clip.contents[0] == "foo bar"
+
+
+def test_engine_copy_waits_for_processing(sut, clipboard):
+    release = threading.Event()
+
+    def slow(text):
+        release.wait(5)
+        return text.upper()
+
+    sut.selected_text_data = sut.data.clip
+    sut.select_text("waiting")
+    sut.selected_action = slow
+    sut.get_processed()
+    sut.command_copy_processed_text()  # the GUI thread is not blocked
+    assert sut.renderer.minimized == 0
+    release.set()
+    assert wait_for(sut, lambda: sut.renderer.minimized)
+    assert clipboard.paste() == "WAITING"
+
+
+def test_engine_copy_reuses_result(sut, clipboard):
+    calls = []
+
+    def counted(text):
+        calls.append(text)
+        return text.upper()
+
+    sut.selected_text_data = sut.data.clip
+    sut.select_text("ready")
+    sut.selected_action = counted
+    sut.get_processed()
+    assert wait_for(sut, lambda: sut.processed_text == "READY")
+    sut.command_copy_processed_text()
+    assert sut.renderer.minimized == 1
+    assert clipboard.paste() == "READY"
+    assert calls == ["ready"]
+
+
+def test_engine_renders_once_per_turn(sut):
+    sut.renderer.process_pending()
+    sut.renderer.updates.clear()
+    for key in "1WSWS":
+        sut.handle_keyboard_events(key)
+    sut.renderer.process_pending()
+    assert len(sut.renderer.updates) == 1
+    title = sut.renderer.updates[0][0]
+    assert title == "Select from clips"
+
+
+def test_engine_server_queue(sut):
+    sut.server_queue.put(("text", "sent text"))
+    sut.server_queue.put("1")
+    sut.handle_server_queue()
+    assert sut.data.clip.contents[0] == "sent text"
+    assert sut.step == engine.TEXT
+
+
+def query(sut, *request):
+    answers = queue.Queue()
+    sut.handle_query(list(request), lambda result=None, error=None: answers.put((result, error)))
+    deadline = time.monotonic() + 2
+    while answers.empty() and time.monotonic() < deadline:
+        if not sut.renderer.process_pending():
+            time.sleep(0.001)  # action results are delivered through the main loop
+    return answers.get_nowait()
+
+
+def test_engine_queries(sut):
+    for text in ["first Quux", "second", "third quux"]:
+        sut.handle_update_request(text)
+    assert query(sut, "clip") == ("third quux", None)
+    assert query(sut, "clip", 2) == ("first Quux", None)
+    assert query(sut, "search", "QUUX") == ([[0, "third quux"], [2, "first Quux"]], None)
+    assert query(sut, "search", "quux", 1) == ([[0, "third quux"]], None)
+    assert query(sut, "apply", "case_upper", "some text") == ("SOME TEXT", None)
+    groups, _ = query(sut, "groups")
+    assert "clips" in groups["texts"]
+    assert "upper" in groups["actions"]["case"]
+
+
+def test_engine_query_errors(sut):
+    assert query(sut, "clip", 100)[1] == "clip: clip index out of range"
+    assert query(sut, "apply", "case_nothing", "text")[1] == "apply: Name not found: case_nothing"
+    assert query(sut, "nothing")[1] == "Unknown query: nothing"
+    assert query(sut, "groups", "extra")[1].startswith("groups: ")
+    assert query(sut, "search", 5)[1] == "search: pattern should be a string"
+    assert query(sut, "apply", 1, "x")[1] == "apply: action name and text should be strings"
+    assert query(sut, "apply", "case_upper", ["x"])[1].startswith("apply: ")
+    assert query(sut, "clip", [0])[1].startswith("clip: ")
+    assert query(sut, "clip")[1] is None  # still serving
+
+
+def test_engine_apply_errors(sut, monkeypatch):
+    def failing(text):
+        raise ValueError("bad " + text)
+
+    def slow(text):
+        time.sleep(0.5)
+        return text
+
+    slow.timeout = 0.05
+    actions = {"test_failing": failing, "test_slow": slow}
+    monkeypatch.setattr(engine.data_struct, "get_action", actions.__getitem__)
+    assert query(sut, "apply", "test_failing", "input") == (None, "apply: bad input")
+    assert query(sut, "apply", "test_slow", "input") == (None, "apply: timeout after 0.05 s")
+
+
+@pytest.mark.usefixtures("testconfig", "clipboard")
+def test_engine_serves_queries(tmp_path):
+    address = str(tmp_path / "test.sock")
+    eng = engine.Engine(engine.Renderer(), transport.create_server(address))
+    thread = threading.Thread(target=eng.start)
+    thread.start()
+    try:
+        with transport.connect(address) as sock:
+            ipc.send_message(sock, ipc.TEXT, "sent text".encode("utf-8"))
+            ipc.recv_message(sock)
+            for _ in range(ROUND_TRIPS):
+                ipc.send_query(sock, "clip", 0)
+                assert ipc.recv_result(sock) == "sent text"
+            ipc.send_query(sock, "search", 5)  # wrong argument type
+            with pytest.raises(ipc.RemoteError):
+                ipc.recv_result(sock)
+            ipc.send_query(sock, "clip", 0)
+            assert ipc.recv_result(sock) == "sent text"
+    finally:
+        eng.renderer.stop()
+        thread.join()
+        eng.close()
@@ -0,0 +1,124 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Test
+
+Framed protocol of the inter process communication
+"""
+
+# pragma pylint: disable=missing-docstring,unused-argument
+
+import io
+import socket
+
+import pytest
+
+from cliptools.modules import ipc
+
+
+@pytest.fixture
+def pair():
+    left, right = socket.socketpair()
+    yield left, right
+    left.close()
+    right.close()
+
+
+def test_keys_round_trip(pair):
+    left, right = pair
+    ipc.send_keys(left, ["ctrl-1", "árvíztűrő"])
+    msg_type, payload = ipc.recv_message(right)
+    assert msg_type == ipc.KEYS
+    assert ipc.decode_keys(payload) == ["ctrl-1", "árvíztűrő"]
+
+
+def test_empty_keys(pair):
+    left, right = pair
+    ipc.send_keys(left, [])
+    assert ipc.recv_message(right) == (ipc.KEYS, bytearray())
+    assert ipc.decode_keys(b"") == []
+
+
+def test_text_round_trip(pair):
+    left, right = pair
+    text = "line with 'quotes'\n\0and zero" * 10
+    ipc.send_text(left, text)
+    msg_type, payload = ipc.recv_message(right)
+    assert msg_type == ipc.TEXT
+    assert payload.decode("utf-8") == text
+
+
+def test_stream_round_trip(pair):
+    left, right = pair
+    data = bytes(range(256)) * 100
+    ipc.send_stream(left, ipc.TEXT, ipc.iter_file_chunks(io.BytesIO(data), size=1000))
+    left.shutdown(socket.SHUT_WR)
+    assert ipc.recv_message(right) == (ipc.TEXT, data)
+    assert ipc.recv_message(right) is None
+
+
+def test_max_size(pair):
+    left, right = pair
+    ipc.send_text(left, "x" * 100)
+    with pytest.raises(ipc.ProtocolError):
+        ipc.recv_message(right, max_size=10)
+
+
+def test_max_size_stream(pair):
+    left, right = pair
+    ipc.send_stream(left, ipc.TEXT, [b"x" * 8, b"x" * 8])
+    with pytest.raises(ipc.ProtocolError):
+        ipc.recv_message(right, max_size=10)
+
+
+def test_short_message(pair):
+    left, right = pair
+    left.sendall(ipc.HEADER.pack(ipc.MAGIC, ipc.TEXT, 10) + b"short")
+    left.shutdown(socket.SHUT_WR)
+    with pytest.raises(ipc.ProtocolError):
+        ipc.recv_message(right)
+
+
+def test_not_framed(pair):
+    left, right = pair
+    left.sendall(b"['hello', 'world']")
+    with pytest.raises(ipc.ProtocolError):
+        ipc.recv_message(right)
+
+
+def test_parser_byte_by_byte():
+    data = ipc.pack_message(ipc.KEYS, b"a\0b") + ipc.pack_message(ipc.TEXT, b"text")
+    parser = ipc.MessageParser()
+    messages = []
+    for i in range(len(data)):
+        parser.feed(data[i : i + 1])
+        message = parser.next_message()
+        if message is not None:
+            messages.append(message)
+    assert messages == [(ipc.KEYS, b"a\0b"), (ipc.TEXT, b"text")]
+    assert parser.is_empty()
+
+
+def test_parser_stream(pair):
+    left, right = pair
+    ipc.send_stream(left, ipc.TEXT, [b"first ", b"second"])
+    ipc.send_keys(left, ["key"])
+    parser = ipc.MessageParser()
+    parser.feed(right.recv(1000))
+    assert parser.next_message() == (ipc.TEXT, b"first second")
+    assert parser.next_message() == (ipc.KEYS, b"key")
+    assert parser.next_message() is None
+
+
+def test_parser_max_size_before_payload():
+    parser = ipc.MessageParser(max_size=10)
+    parser.feed(ipc.HEADER.pack(ipc.MAGIC, ipc.TEXT, 1000))
+    with pytest.raises(ipc.ProtocolError):
+        parser.next_message()
+
+
+def test_parser_not_framed():
+    parser = ipc.MessageParser()
+    parser.feed(b"['hello', 'world']")
+    with pytest.raises(ipc.ProtocolError):
+        parser.next_message()
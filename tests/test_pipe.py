@@ -0,0 +1,95 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Test
+
+Pipe mode, applying an action on the standard input without GUI
+"""
+
+# pragma pylint: disable=missing-docstring,unused-argument
+
+import io
+import os
+import subprocess
+import sys
+import tracemalloc
+
+import pytest
+
+from cliptools.modules import pipe, text_functions
+
+
+def run_pipe(args, data):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    # loaded modules are checked at exit, main calls sys.exit
+    code = (
+        "import atexit, sys\n"
+        "atexit.register(lambda: print(sorted(sys.modules), file=sys.stderr))\n"
+        "from cliptools import main\n"
+        "main.main()"
+    )
+    return subprocess.run(
+        [sys.executable, "-c", code, "apply", *args],
+        input=data,
+        capture_output=True,
+        env=env,
+        check=False,
+    )
+
+
+def test_iter_chunks():
+    assert list(pipe.iter_chunks(io.StringIO("abcdefg"), 3)) == ["abc", "def", "g"]
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        text_functions.case_title,
+        text_functions.accents_shave_marks,
+        text_functions.accents_asciize,
+        text_functions.split_semicolon,
+        text_functions.filename_double,
+    ],
+)
+@pytest.mark.parametrize("size", [1, 2, 5, 1000])
+def test_apply_stream_same_result(action, size):
+    text = "Árvíztűrő; tükörfúró\\gép\r\nfoo bar;baz\n\nA\u0301rvi\u0301z last Line no end"
+    chunks = pipe.iter_chunks(io.StringIO(text), size)
+    assert "".join(pipe.apply_stream(action, chunks)) == action(text)
+
+
+@pytest.mark.parametrize(
+    "action", [text_functions.split_semicolon, text_functions.accents_shave_marks]
+)
+def test_apply_stream_memory(action):
+    # one long line, streaming variants do not wait for the line end
+    part = "Hello World; “a\u0301rvi\u0301ztu\u030brő”; "
+
+    def chunks():
+        for _ in range(100):
+            yield part * 1000  # 2.7 million characters
+
+    size = 0
+    tracemalloc.start()
+    try:
+        for result in pipe.apply_stream(action, chunks()):
+            size += len(result)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert size > 2_000_000
+    assert peak < 2_000_000
+
+
+def test_pipe_main():
+    result = run_pipe(["case_upper"], "árvíztűrő\r\ntükör\n".encode("utf-8"))
+    assert result.returncode == 0
+    assert result.stdout == "ÁRVÍZTŰRŐ\r\nTÜKÖR\n".encode("utf-8")
+    assert b"'wx'" not in result.stderr
+    assert b"'cliptools.modules.pipe'" in result.stderr
+
+
+def test_pipe_unknown_action():
+    result = run_pipe(["nothing"], b"")
+    assert result.returncode == 2
+    assert b"Name not found" in result.stderr
@@ -0,0 +1,55 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Test
+
+Cache of the action previews, i.e. action results on the selected text
+"""
+
+# pragma pylint: disable=missing-docstring,unused-argument
+
+from cliptools.modules import data_struct, preview_cache
+
+
+def test_cache_get_put():
+    sut = preview_cache.PreviewCache(1000)
+    assert sut.get(str.upper, "foo") is None
+    sut.put(str.upper, "foo", "FOO")
+    assert sut.get(str.upper, "foo") == "FOO"
+    assert sut.get(str.lower, "foo") is None
+
+
+def test_cache_text_change():
+    sut = preview_cache.PreviewCache(1000)
+    sut.put(str.upper, "foo", "FOO")
+    assert sut.get(str.upper, "bar") is None
+    assert sut.get(str.upper, "foo") is None
+    assert sut.size == 0
+
+
+def test_cache_size_limit():
+    sut = preview_cache.PreviewCache(300)
+    sut.put(str.upper, "x", "A" * 100)
+    sut.put(str.lower, "x", "B" * 100)
+    sut.get(str.upper, "x")  # now lower is the least recently used
+    sut.put(str.title, "x", "C" * 100)
+    assert sut.get(str.lower, "x") is None
+    assert sut.get(str.upper, "x") == "A" * 100
+    assert sut.size <= 300
+    sut.put(str.strip, "x", "D" * 1000)  # too large, not cached
+    assert sut.get(str.strip, "x") is None
+
+
+def test_action_get_name_cached(testconfig):
+    calls = []
+
+    def action(text):
+        calls.append(text)
+        return text.upper()
+
+    sut = data_struct.ActionData("SUT")
+    sut.add_content(("0", action))
+    text = "FOo"
+    assert sut.get_name(0, text) == "0: FOO"
+    assert sut.get_name(0, text) == "0: FOO"
+    assert calls == [text]
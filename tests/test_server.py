@@ -0,0 +1,170 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Test
+
+Internal server to handle commands delegated by newer instances
+"""
+
+# pragma pylint: disable=missing-docstring,unused-argument,redefined-outer-name
+
+import queue
+import socket
+import threading
+
+import pytest
+
+from cliptools import config
+from cliptools.modules import ipc, server, transport
+
+
+SUCCESS = (ipc.RESPONSE, config.SERVER_SUCCESS.encode("utf-8"))
+
+
+@pytest.fixture
+def address(tmp_path):
+    return str(tmp_path / "test.sock")
+
+
+@pytest.fixture
+def listener(address):
+    server_queue = queue.Queue()
+    woken = threading.Event()
+    running = server.init_server_loop(transport.create_server(address), server_queue, woken.set)
+    running.woken = woken
+    yield running
+    running.stop()
+
+
+def get_items(server_queue, count):
+    return [server_queue.get(timeout=2) for _ in range(count)]
+
+
+def test_keys(listener, address):
+    with transport.connect(address) as sock:
+        ipc.send_keys(sock, ["a", "b"])
+        assert ipc.recv_message(sock) == SUCCESS
+    assert get_items(listener.server_queue, 2) == ["a", "b"]
+    assert listener.woken.wait(timeout=2)  # the loop wakes the engine after the response
+
+
+def test_text(listener, address):
+    with transport.connect(address) as sock:
+        ipc.send_stream(sock, ipc.TEXT, [b"sent ", b"text"])
+        assert ipc.recv_message(sock) == SUCCESS
+    assert get_items(listener.server_queue, 1) == [("text", "sent text")]
+
+
+def test_more_messages_on_a_connection(listener, address):
+    with transport.connect(address) as sock:
+        for key in "abc":
+            ipc.send_keys(sock, [key])
+            assert ipc.recv_message(sock) == SUCCESS
+    assert get_items(listener.server_queue, 3) == ["a", "b", "c"]
+
+
+def test_unknown_type(listener, address):
+    with transport.connect(address) as sock:
+        ipc.send_message(sock, 99)
+        assert ipc.recv_message(sock)[0] == ipc.ERROR
+    assert listener.server_queue.empty()
+
+
+def test_legacy(listener, address):
+    with transport.connect(address) as sock:
+        sock.sendall(repr(["a", "b"]).encode("utf-8"))
+        sock.shutdown(socket.SHUT_WR)
+        assert sock.recv(100).decode("utf-8") == config.SERVER_SUCCESS
+    assert get_items(listener.server_queue, 2) == ["a", "b"]
+
+
+def test_legacy_only_keys(listener, address):
+    forged = ["a", ("text", "forged"), ("query", ["clip"], None), 1, "b"]
+    with transport.connect(address) as sock:
+        sock.sendall(repr(forged).encode("utf-8"))
+        sock.shutdown(socket.SHUT_WR)
+        assert sock.recv(100).decode("utf-8") == config.SERVER_SUCCESS
+    assert get_items(listener.server_queue, 2) == ["a", "b"]
+    assert listener.server_queue.empty()
+
+
+def test_size_limit(listener, address, monkeypatch):
+    monkeypatch.setattr(config, "SERVER_MAX_MESSAGE", 10)
+    with transport.connect(address) as sock:
+        ipc.send_text(sock, "too long text")
+        assert ipc.recv_message(sock) == (ipc.ERROR, b"Message too large")
+        assert ipc.recv_message(sock) is None
+    assert listener.server_queue.empty()
+
+
+def test_stuck_client_does_not_block(listener, address):
+    with transport.connect(address) as stuck:
+        stuck.sendall(ipc.MAGIC)  # header is never finished
+        with transport.connect(address) as sock:
+            ipc.send_keys(sock, ["a"])
+            assert ipc.recv_message(sock) == SUCCESS
+        assert get_items(listener.server_queue, 1) == ["a"]
+
+
+def test_deadline(address, monkeypatch):
+    monkeypatch.setattr(config, "SERVER_TIMEOUT", 0.1)
+    running = server.init_server_loop(
+        transport.create_server(address), queue.Queue(), lambda: None
+    )
+    with transport.connect(address) as stuck:
+        stuck.settimeout(2)
+        stuck.sendall(ipc.MAGIC)
+        assert stuck.recv(100) == b""  # disconnected
+    running.stop()
+
+
+def test_burst(listener, address, monkeypatch):
+    monkeypatch.setattr(config, "SERVER_MAX_CLIENTS", 4)
+    results = []
+
+    def client(number):
+        with transport.connect(address) as sock:
+            ipc.send_keys(sock, ["{}-{}".format(number, i) for i in range(3)])
+            results.append(ipc.recv_message(sock))
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [SUCCESS] * 50
+    items = get_items(listener.server_queue, 150)
+    for i in range(0, 150, 3):
+        # commands of a message are kept together and in order
+        number = items[i].split("-")[0]
+        assert items[i : i + 3] == ["{}-{}".format(number, j) for j in range(3)]
+
+
+def test_query(listener, address):
+    with transport.connect(address) as sock:
+        ipc.send_query(sock, "clip", 0)
+        ipc.send_keys(sock, ["a"])  # waits for the answer of the query
+        name, request, reply = listener.server_queue.get(timeout=2)
+        assert (name, request) == ("query", ["clip", 0])
+        assert listener.server_queue.empty()
+        reply({"text": "answer"})
+        assert ipc.recv_result(sock) == {"text": "answer"}
+        assert ipc.recv_message(sock) == SUCCESS
+    assert get_items(listener.server_queue, 1) == ["a"]
+
+
+def test_query_error(listener, address):
+    with transport.connect(address) as sock:
+        ipc.send_query(sock, "clip", 100)
+        sock.shutdown(socket.SHUT_WR)  # answer is still sent
+        _, _, reply = listener.server_queue.get(timeout=2)
+        reply(error="clip: out of range")
+        with pytest.raises(ipc.RemoteError, match="out of range"):
+            ipc.recv_result(sock)
+
+
+def test_wrong_query(listener, address):
+    with transport.connect(address) as sock:
+        ipc.send_message(sock, ipc.QUERY, b'{"not": "a list"}')
+        assert ipc.recv_message(sock) == (ipc.ERROR, b"Wrong query")
+    assert listener.server_queue.empty()
@@ -0,0 +1,111 @@
+"""ClipTools clipboard manager and text processing tools
+with a lines based GUI interface
+
+Test
+
+Sockets of the single instance detection and the command delegation
+"""
+
+# pragma pylint: disable=missing-docstring,unused-argument,redefined-outer-name
+
+import os
+import queue
+import socket
+import time
+
+import pytest
+
+from cliptools import config, main
+from cliptools.modules import server, transport
+
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="no Unix sockets")
+
+ROUND_TRIPS = 200
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "test.sock")
+
+
+def start_server(address):
+    server_socket = transport.create_server(address)
+    server_queue = queue.Queue()
+    listener = server.init_server_loop(server_socket, server_queue, lambda: None)
+    return listener, server_queue
+
+
+def test_runtime_dir(tmp_path, monkeypatch):
+    os.chmod(tmp_path, 0o700)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert transport.get_runtime_dir() == str(tmp_path)
+    os.chmod(tmp_path, 0o755)
+    with pytest.raises(OSError):
+        transport.get_runtime_dir()
+
+
+def test_tcp_transport(monkeypatch):
+    monkeypatch.setattr(config, "TRANSPORT", "tcp")
+    assert transport.get_address() == ("localhost", config.PORT)
+
+
+def test_second_server_fails(socket_path):
+    server_socket = transport.create_server(socket_path)
+    with server_socket, pytest.raises(OSError):
+        transport.create_server(socket_path)
+
+
+def test_stale_socket_replaced(socket_path):
+    crashed = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    crashed.bind(socket_path)
+    crashed.close()  # the file is left there
+    assert transport.is_stale(socket_path)
+    with transport.create_server(socket_path):
+        assert not transport.is_stale(socket_path)
+
+
+def test_not_a_socket_kept(socket_path):
+    with open(socket_path, "w", encoding="utf-8") as file:
+        file.write("data")
+    assert not transport.is_stale(socket_path)
+    with pytest.raises(OSError):
+        transport.create_server(socket_path)
+
+
+def test_delegation(socket_path):
+    listener, server_queue = start_server(socket_path)
+    assert main._delegate_to_existing_instance(["a", "b"], socket_path)
+    assert [server_queue.get(timeout=1), server_queue.get(timeout=1)] == ["a", "b"]
+    listener.stop()
+
+
+def measure_delegation(address):
+    listener, server_queue = start_server(address)
+    address = listener.server_socket.getsockname()
+    start = time.perf_counter()
+    for _ in range(ROUND_TRIPS):
+        assert main._delegate_to_existing_instance(["1"], address)
+    elapsed = time.perf_counter() - start
+    listener.stop()
+    assert server_queue.qsize() == ROUND_TRIPS
+    return elapsed / ROUND_TRIPS
+
+
+def test_delegation_round_trips(socket_path):
+    # correctness of the benchmark loop, without timing
+    measure_delegation(socket_path)
+    measure_delegation(("localhost", 0))
+
+
+@pytest.mark.benchmark
+def test_delegation_latency_benchmark(socket_path):
+    unix_time = measure_delegation(socket_path)
+    tcp_time = measure_delegation(("localhost", 0))
+    print(
+        "Delegation round trip, unix: {:.1f} us, tcp: {:.1f} us".format(
+            unix_time * 1e6, tcp_time * 1e6
+        )
+    )
+    assert unix_time < 0.01
+    assert tcp_time < 0.01
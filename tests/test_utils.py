@@ -8,6 +8,8 @@ Utility functions
 
 # pragma pylint: disable=missing-docstring,unused-argument
 
+import time
+
 import pytest
 
 from cliptools.modules import utils
@@ -33,9 +35,81 @@ def test_limit_text_long(testconfig):
     assert utils.limit_text(in_txt) == ou_txt
 
 
+@pytest.mark.parametrize(
+    "in_txt",
+    [
+        "",
+        "   ",
+        "exactly 10",
+        "exactly 11.",
+        "  exactly 10  \n ",
+        "ten chars\n  ",
+        "ten chars\n  x",
+        "\n\nLong\nand\nboring\ntext\n\n",
+    ],
+)
+def test_limit_text_same_as_strip(testconfig, in_txt):
+    text = in_txt.strip().replace("\n", " ")
+    expected = text if len(text) <= 10 else text[:5] + "[...]"
+    assert utils.limit_text(in_txt) == expected
+
+
+def test_limit_text_huge(testconfig):
+    assert utils.limit_text("x\n" * 10_000_000) == "x x x[...]"
+    assert utils.limit_text(" " + "y" * 20_000_000 + " ") == "yyyyy[...]"
+    assert utils.limit_text("z" * 20_000_000) == "zzzzz[...]"
+
+
+@pytest.mark.benchmark
+def test_limit_text_huge_benchmark(testconfig):
+    # Regression benchmark: cost must depend on the display length, not the text size
+    # stripping and replacing 20 MB texts 100 times would take seconds
+    texts = ["x\n" * 10_000_000, " " + "y" * 20_000_000 + " ", "z" * 20_000_000]
+    start = time.perf_counter()
+    for _ in range(100):
+        for text in texts:
+            utils.limit_text(text)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_text_prefix(testconfig):
+    assert utils.text_prefix("short") == "short"
+    assert utils.text_prefix("x" * 100) == "x" * 20
+    assert utils.text_prefix("\n\n" + "x" * 100) == "\n\n" + "x" * 20
+    assert utils.text_prefix("   ") == "   "
+
+
 def test_safe_action_good(testconfig):
     assert utils.safe_action("good", action_good) == "good:good"
 
 
 def test_safe_action_wrong(testconfig):
     assert utils.safe_action("wrong", action_wrong) == "ERROR: division by zero"
+
+
+@pytest.mark.parametrize(
+    ("text", "prefix_safe", "cut"),
+    [
+        ("first\nsecond", False, 6),
+        ("first\r\nsecond", False, 7),
+        ("no line end", False, 0),
+        ("no line end", True, 8),
+        ("no_space", True, 0),
+        ("no_space_at_all", True, 15),
+    ],
+)
+def test_find_cut(text, prefix_safe, cut):
+    assert utils.find_cut(text, prefix_safe, limit=10) == cut
+
+
+def test_stream_action():
+    def action(text):
+        return "<{}>".format(text)
+
+    assert list(utils.stream_action(action, ["a", "b\nc", "d\n", "e"])) == [
+        "<ab\n>",
+        "<cd\n>",
+        "<e>",
+    ]
+    action.prefix_safe = True
+    assert list(utils.stream_action(action, ["a b", "c"])) == ["<a >", "<bc>"]